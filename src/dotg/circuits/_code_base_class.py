@@ -1,11 +1,42 @@
 """This module provides base classes for code families and code members."""
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Optional
 
 import stim
 
 
+@lru_cache(maxsize=128)
+def _generated_circuit(code_task: str, distance: int, rounds: int) -> stim.Circuit:
+    """Generate and flatten a stim circuit. Results are cached, so callers must copy the
+    returned circuit before handing it out."""
+    return stim.Circuit.generated(
+        code_task=code_task, distance=distance, rounds=rounds
+    ).flattened()
+
+
+def generated_circuit(code_task: str, distance: int, rounds: int) -> stim.Circuit:
+    """Return a flattened stim circuit for the given code task. Generation and
+    flattening are only performed once per set of arguments; each call returns a fresh
+    copy that is safe to mutate.
+
+    Parameters
+    ----------
+    code_task : str
+        The stim code task, e.g. "surface_code:rotated_memory_z".
+    distance : int
+        Code distance.
+    rounds : int
+        Number of rounds.
+
+    Returns
+    -------
+    stim.Circuit
+    """
+    return _generated_circuit(code_task, distance, rounds).copy()
+
+
 class CodeFamily(ABC):
     """Base class for code families."""
 
@@ -20,6 +51,8 @@ class CodeFamily(ABC):
 class Code(ABC):
     """Base class for subcodes."""
 
+    __slots__ = ("distance", "rounds")
+
     def __init__(self, distance: int, rounds: Optional[int] = None) -> None:
         self.distance = distance
         self.rounds = rounds or distance
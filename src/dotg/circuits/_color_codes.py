@@ -4,7 +4,7 @@ from typing import Optional
 
 import stim
 
-from dotg.circuits._code_base_class import Code, CodeFamily
+from dotg.circuits._code_base_class import Code, CodeFamily, generated_circuit
 
 
 class ColorCode(CodeFamily):
@@ -24,6 +24,8 @@ class ColorCode(CodeFamily):
             to the code distance.
         """
 
+        __slots__ = ()
+
         def __init__(self, distance: int, rounds: Optional[int] = None) -> None:
             super().__init__(distance, rounds)
             if distance % 2 == 0:
@@ -31,8 +33,8 @@ class ColorCode(CodeFamily):
 
         @property
         def memory(self) -> stim.Circuit:
-            return stim.Circuit.generated(
+            return generated_circuit(
                 code_task="color_code:memory_xyz",
                 distance=self.distance,
                 rounds=self.rounds,
-            ).flattened()
+            )
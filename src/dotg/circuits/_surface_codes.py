@@ -1,23 +1,39 @@
 """This module provides a code family class for the surface codes."""
 
-from typing import Optional
+from typing import ClassVar, Optional
 
 import stim
 
-from dotg.circuits._code_base_class import Code, CodeFamily
+from dotg.circuits._code_base_class import Code, CodeFamily, generated_circuit
+
+_MEMORY_BASES = {"x": "x", "X": "x", "z": "z", "Z": "z"}
 
 
 class SurfaceCodeSubClass(Code):
     """A base class for surface codes. Adds an extra check on the memory basis being
-    considered."""
+    considered. Subclasses only need to set the `_variant` class attribute, which
+    selects the stim code task."""
+
+    __slots__ = ("memory_basis",)
+
+    _variant: ClassVar[str]
 
     def __init__(
         self, distance: int, rounds: Optional[int] = None, memory_basis: str = "Z"
     ) -> None:
         super().__init__(distance, rounds)
-        self.memory_basis = memory_basis.lower()
-        if self.memory_basis not in ["x", "z"]:
+        basis = _MEMORY_BASES.get(memory_basis)
+        if basis is None:
             raise ValueError("Memory basis must be one of `X` or `Z`.")
+        self.memory_basis = basis
+
+    @property
+    def memory(self) -> stim.Circuit:
+        return generated_circuit(
+            code_task=f"surface_code:{self._variant}_memory_{self.memory_basis}",
+            distance=self.distance,
+            rounds=self.rounds,
+        )
 
 
 class SurfaceCode(CodeFamily):
@@ -46,18 +62,9 @@ class SurfaceCode(CodeFamily):
             If memory_basis kwarg is not one of X, x, Z or z.
         """
 
-        def __init__(
-            self, distance: int, rounds: Optional[int] = None, memory_basis: str = "Z"
-        ) -> None:
-            super().__init__(distance=distance, rounds=rounds, memory_basis=memory_basis)
+        __slots__ = ()
 
-        @property
-        def memory(self) -> stim.Circuit:
-            return stim.Circuit.generated(
-                code_task=f"surface_code:rotated_memory_{self.memory_basis}",
-                distance=self.distance,
-                rounds=self.rounds,
-            ).flattened()
+        _variant = "rotated"
 
     class Unrotated(SurfaceCodeSubClass):
         """Unrotated surface code class. After initialisation,
@@ -80,15 +87,6 @@ class SurfaceCode(CodeFamily):
             If memory_basis kwarg is not one of X, x, Z or z.
         """
 
-        def __init__(
-            self, distance: int, rounds: Optional[int] = None, memory_basis: str = "Z"
-        ) -> None:
-            super().__init__(distance=distance, rounds=rounds, memory_basis=memory_basis)
-
-        @property
-        def memory(self) -> stim.Circuit:
-            return stim.Circuit.generated(
-                code_task=f"surface_code:unrotated_memory_{self.memory_basis}",
-                distance=self.distance,
-                rounds=self.rounds,
-            ).flattened()
+        __slots__ = ()
+
+        _variant = "unrotated"
@@ -1,6 +1,7 @@
 """This module provides access to the Belief-Propagation decoder from the LDPC package: 
 https://github.com/quantumgizmos/ldpc"""
 
+import math
 import warnings
 from typing import List, Tuple
 
@@ -12,7 +13,6 @@ from dotg.decoders._belief_propagation_base_class import (
     LDPCBeliefPropagationDecoder,
     LDPCDecoderOptions,
 )
-from dotg.utilities import Sampler
 
 
 class BeliefPropagation(LDPCBeliefPropagationDecoder):
@@ -34,17 +34,21 @@ class BeliefPropagation(LDPCBeliefPropagationDecoder):
     def __init__(
         self, circuit: stim.Circuit, decoder_options: LDPCDecoderOptions
     ) -> None:
-        super().__init__(circuit=circuit, decoder_options=decoder_options)
-
-        if self.decoder_options.osd_method is not None:
-            self.decoder_options = LDPCDecoderOptions(
+        # Strip the OSD options before the decoder object is built, so that a BPOSD
+        # decoder is never constructed only to be thrown away.
+        if decoder_options.osd_method is not None:
+            decoder_options = LDPCDecoderOptions(
                 max_iterations=decoder_options.max_iterations,
                 message_updates=decoder_options.message_updates,
                 min_sum_scaling_factor=decoder_options.min_sum_scaling_factor,
             )
 
+        super().__init__(circuit=circuit, decoder_options=decoder_options)
+
+        self._logical_error_warned = False
+
     def decode_syndrome(  # type: ignore
-        self, syndrome: List[int] | NDArray
+        self, syndrome: List[int] | NDArray, compute_remaining: bool = True
     ) -> Tuple[bool, NDArray, NDArray]:
         """Decode a syndrome using belief propagation. As BP is not guaranteed to decode,
           this method returns a 3-tuple. The elements are as follows:
@@ -57,6 +61,10 @@ class BeliefPropagation(LDPCBeliefPropagationDecoder):
         ----------
         syndrome : List[int] | NDArray
             Array of syndromes.
+        compute_remaining : bool, optional
+            Whether to compute the remaining syndrome, by default True. If False, the
+            input syndrome is returned in its place, saving a matrix vector product
+            when the caller only needs the error pattern.
 
         Returns
         -------
@@ -68,19 +76,19 @@ class BeliefPropagation(LDPCBeliefPropagationDecoder):
                   did not converge, this value is overwritten to be the input syndrome.
             For more information see the docstring of decoders.LDPCDecoderOptions.
         """
-        syndrome = np.asarray(syndrome)
+        syndrome = np.ascontiguousarray(syndrome, dtype=np.uint8)
 
-        error_pattern: NDArray = self._decoder.decode(np.asarray(syndrome))
+        error_pattern: NDArray = self._decode(syndrome)
 
         remaining_syndrome: NDArray = (
             self.update_syndrome_from_error_pattern(
                 syndrome=syndrome, error_pattern=error_pattern
             )
-            if self._decoder.converge
+            if compute_remaining and self.decoder.converge
             else syndrome
         )
 
-        return bool(self._decoder.converge), error_pattern, remaining_syndrome
+        return bool(self.decoder.converge), error_pattern, remaining_syndrome
 
     def update_syndrome_from_error_pattern(
         self, syndrome: NDArray, error_pattern: NDArray
@@ -101,16 +109,53 @@ class BeliefPropagation(LDPCBeliefPropagationDecoder):
         NDArray
             An updated syndrome array.
         """
-        return np.asarray(
-            [
-                (sum(x * y for x, y in zip(parity_row, error_pattern)) + syndrome[idx])
-                % 2
-                for idx, parity_row in enumerate(self.parity_check)
-            ]
+        return (
+            self._checks.parity_check_csr @ np.asarray(error_pattern, dtype=np.uint8)
+            + np.asarray(syndrome, dtype=np.uint8)
+        ) & 1
+
+    def update_syndromes_from_error_patterns(
+        self, syndromes: NDArray, error_patterns: NDArray
+    ) -> NDArray:
+        """Batched version of `update_syndrome_from_error_pattern`, with one syndrome
+        and one error pattern per row. The products with the parity check matrix are
+        computed as a single sparse matrix product.
+
+        Parameters
+        ----------
+        syndromes : NDArray
+            Syndromes that were decoded, of dimension (num_shots * num_detectors).
+        error_patterns : NDArray
+            Error patterns found at the point of algorithm termination, of dimension
+            (num_shots * num_error_mechanisms).
+
+        Returns
+        -------
+        NDArray
+            Updated syndromes, of dimension (num_shots * num_detectors).
+        """
+        return (
+            (
+                self._checks.parity_check_csr
+                @ np.asarray(error_patterns, dtype=np.uint8).T
+            ).T
+            + np.asarray(syndromes, dtype=np.uint8)
+        ) & 1
+
+    def _warn_about_logical_error(self) -> None:
+        """Warn that logical errors only count shots where BP converges, the first time
+        this decoder calculates one."""
+        if self._logical_error_warned:
+            return
+        self._logical_error_warned = True
+        warnings.warn(
+            """As Belief Propagation is not guaranteed to converge on quantum codes, it 
+            does not yet permit logical error functionality. This function will only 
+            calculate the logical error on those cases where BP converges."""
         )
 
     def logical_error(  # type: ignore
-        self, num_shots: int | float, exclude_empty: bool = False
+        self, num_shots: int | float, exclude_empty: bool = False, num_workers: int = 1
     ) -> Tuple[float, float]:
         """Calculate the logical error probability of this decoder on the given circuit,
         over a number of syndromes.
@@ -122,13 +167,16 @@ class BeliefPropagation(LDPCBeliefPropagationDecoder):
         exclude_empty : bool
             Whether or not to exclude empty syndromes from the simulation, by default
             False.
+        num_workers : int, optional
+            Number of processes to decode with, by default 1. See `decode_batch`.
 
         Raises
         ------
         warnings.warn
             As BP is not guaranteed to covnerge on quantum codes, it cannot provide a
             true logical error probability. As such, we report on only those cases where
-            the algorithm converges.
+            the algorithm converges. This is only raised on the first call for each
+            decoder.
 
         Returns
         -------
@@ -136,25 +184,20 @@ class BeliefPropagation(LDPCBeliefPropagationDecoder):
             The logical error probability and the precision (1 over the sqrt of the
             number of samples).
         """
-        warnings.warn(
-            """As Belief Propagation is not guaranteed to converge on quantum codes, it 
-            does not yet permit logical error functionality. This function will only 
-            calculate the logical error on those cases where BP converges."""
-        )
+        self._warn_about_logical_error()
 
-        sampler = Sampler(circuit=self.circuit)
-        syndromes, logicals = sampler(num_shots=num_shots, exclude_empty=exclude_empty)
-
-        logical_failures = 0
-        convergence_events = 0
-        for syndrome, logical in zip(syndromes, logicals):
-            converged, error_pattern, _ = self.decode_syndrome(syndrome=syndrome)
-            if not converged:
-                continue
+        syndromes, logicals = self.sampler(
+            num_shots=num_shots, exclude_empty=exclude_empty, bit_packed=True
+        )
 
-            convergence_events += 1
-            logical_failures += self.is_logical_failure(error_pattern, logical)
+        converged, error_patterns = self.decode_batch(
+            syndromes, bit_packed=True, num_workers=num_workers
+        )
+        failures = self.logical_failures(error_patterns, logicals, bit_packed=True)
+        convergence_events = int(np.count_nonzero(converged))
+        logical_failures = int(np.count_nonzero(failures & converged))
 
         if convergence_events > 0:
-            return logical_failures / convergence_events, 1 / np.sqrt(convergence_events)
+            precision = 1.0 / math.sqrt(convergence_events)
+            return logical_failures / convergence_events, precision
         return 0, 0
@@ -1,17 +1,22 @@
 """This module provides an abstract base class for Belief Propagation based decoders."""
 
 from abc import ABC
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from dataclasses import dataclass, field
 from enum import IntEnum
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import stim
 from ldpc import bp_decoder, bposd_decoder
 from numpy.typing import NDArray
+from scipy.sparse import csr_matrix
+from scipy.special import expit  # pylint: disable=no-name-in-module
 
 from dotg.decoders._decoder_base_class import Decoder
-from dotg.utilities import CircuitUnderstander
+from dotg.utilities import Sampler, cached_circuit_understander
+from dotg.utilities._bit_packing import pack_rows, packed_mod2_matmul
 
 
 class MessageUpdates(IntEnum):
@@ -94,10 +99,12 @@ class LDPCDecoderOptions:
                 f"Received: {self.max_iterations}"
                 ""
             )
-        self.message_updates = self.message_updates or MessageUpdates.PROD_SUM
-
-        if self.message_updates not in [0, 1]:
-            raise ValueError("Invalid message updating scheme.")
+        try:
+            self.message_updates = MessageUpdates(
+                self.message_updates or MessageUpdates.PROD_SUM
+            )
+        except ValueError as error:
+            raise ValueError("Invalid message updating scheme.") from error
 
         if self.message_updates == 1:
             self.min_sum_scaling_factor = self.min_sum_scaling_factor or 1
@@ -118,9 +125,80 @@ class LDPCDecoderOptions:
             self.osd_order = -1
 
 
+def _decode_rows(
+    decoder: bp_decoder, syndromes: NDArray, num_detectors: int, bit_packed: bool
+) -> Tuple[NDArray[np.bool_], NDArray[np.uint8]]:
+    """Decode each row of syndromes with the given decoder object, recording whether
+    it converged and the error pattern it terminated on. Empty syndromes are not
+    passed to the decoder: BP converges on them straight away with the all zero error
+    pattern, as every error probability is below 1/2."""
+    converged = np.ones(len(syndromes), dtype=np.bool_)
+    error_patterns = np.zeros(
+        (len(syndromes), len(decoder.channel_probs)), dtype=np.uint8
+    )
+    for idx in np.flatnonzero(syndromes.any(axis=1)):
+        syndrome = syndromes[idx]
+        if bit_packed:
+            syndrome = np.unpackbits(syndrome, count=num_detectors, bitorder="little")
+        error_patterns[idx] = decoder.decode(syndrome)
+        converged[idx] = decoder.converge
+
+    return converged, error_patterns
+
+
+# Decoder object owned by a worker process of `decode_batch`.
+_WORKER_DECODER: Optional[bp_decoder] = None
+
+
+def _initialise_worker(decoder_class: type, decoder_kwargs: dict) -> None:
+    global _WORKER_DECODER  # pylint: disable=global-statement
+    _WORKER_DECODER = decoder_class(**decoder_kwargs)
+
+
+def _decode_rows_in_worker(
+    syndromes: NDArray, num_detectors: int, bit_packed: bool
+) -> Tuple[NDArray[np.bool_], NDArray[np.uint8]]:
+    return _decode_rows(_WORKER_DECODER, syndromes, num_detectors, bit_packed)
+
+
+@dataclass
+class _CheckMatrixForms:
+    """The check matrices of an LDPCBeliefPropagationDecoder in the forms used while
+    decoding."""
+
+    parity_check_csr: csr_matrix
+    logical_check_csr: csr_matrix
+    logical_check_packed: NDArray[np.uint64]
+    logical_support: Optional[NDArray[np.intp]]
+
+
+@dataclass
+class _WorkerPool:
+    """Worker processes that `decode_batch` splits batches across, each holding a copy
+    of the decoder object."""
+
+    executor: ProcessPoolExecutor
+    num_workers: int
+
+
+@dataclass
+class _DecoderState:
+    """The ldpc decoder object of an LDPCBeliefPropagationDecoder, what it was built
+    from, and other objects the decoder builds and reuses between calls."""
+
+    decoder: Any = None
+    built_from: Optional[LDPCDecoderOptions] = None
+    decoder_class: type = bp_decoder
+    decoder_kwargs: Dict[str, Any] = field(default_factory=dict)
+    sampler: Optional[Sampler] = None
+    posteriors: Optional[Tuple[NDArray, NDArray, NDArray]] = None
+    worker_pool: Optional[_WorkerPool] = None
+
+
 class LDPCBeliefPropagationDecoder(Decoder, ABC):
     """A base class for decoders that inherit from the bp_decoder object in the LDPC
-    package.
+    package. If batches are decoded across worker processes, close the decoder when
+    done with it, or use it as a context manager.
 
     Parameters
     ----------
@@ -144,13 +222,41 @@ class LDPCBeliefPropagationDecoder(Decoder, ABC):
         super().__init__(circuit=circuit)
         self.decoder_options = decoder_options
 
-        self._understander = CircuitUnderstander(circuit=circuit)
+        understander = cached_circuit_understander(circuit=circuit)
+        self.parity_check = understander.parity_check.toarray()
+        self.logical_check = understander.logical_check.toarray()
+        self.error_probabilities = np.asarray(understander.error_probabilities)
+
+        self._checks = _CheckMatrixForms(
+            parity_check_csr=understander.parity_check,
+            logical_check_csr=understander.logical_check,
+            logical_check_packed=pack_rows(self.logical_check),
+            # Memory experiments usually have a single logical observable, in which
+            # case its logical flip is just the parity of the error pattern on its
+            # support.
+            logical_support=(
+                np.flatnonzero(self.logical_check[0])
+                if self.logical_check.shape[0] == 1
+                else None
+            ),
+        )
+        self._state = _DecoderState()
+        self.decoder = self.decoder_options
 
-        self.parity_check = np.asarray(self._understander.parity_check)
-        self.logical_check = np.asarray(self._understander.logical_check)
-        self.error_probabilities = np.asarray(self._understander.error_probabilities)
+    @property
+    def sampler(self) -> Sampler:
+        """Return a syndrome sampler for the circuit. It is built on first access and
+        reused afterwards, so the detector sampler is only compiled once.
 
-        self.decoder = self.decoder_options
+        Returns
+        -------
+        Sampler
+            Syndrome sampler for self.circuit.
+        """
+        sampler = self._state.sampler
+        if sampler is None:
+            sampler = self._state.sampler = Sampler(circuit=self.circuit)
+        return sampler
 
     @property
     def decoder(self) -> bp_decoder:
@@ -161,7 +267,7 @@ class LDPCBeliefPropagationDecoder(Decoder, ABC):
         bp_decoder
             Decoder object from the LDPC package.
         """
-        return self._decoder
+        return self._state.decoder
 
     @decoder.setter
     def decoder(self, decoder_options: LDPCDecoderOptions):
@@ -170,58 +276,165 @@ class LDPCBeliefPropagationDecoder(Decoder, ABC):
         Parameters
         ----------
         decoder_options : LDPCDecoderOptions
-            Decoder options. Determins which decoder object is used.
+            Decoder options. Determins which decoder object is used. If they are
+            equal to the options the current decoder object was built from, the
+            decoder object is kept as is.
         """
-        input_vector_type = 0
+        if decoder_options == self._state.built_from:
+            return
+        # ldpc accepts scipy sparse matrices directly, which is far quicker to set up
+        # from than the dense parity check.
+        decoder_kwargs = {
+            "parity_check_matrix": self._checks.parity_check_csr,
+            "max_iter": decoder_options.max_iterations,
+            "channel_probs": self.error_probabilities,
+            "input_vector_type": 0,
+            "bp_method": decoder_options.message_updates,
+        }
+        if decoder_options.message_updates == MessageUpdates.MIN_SUM:
+            decoder_kwargs["ms_scaling_factor"] = decoder_options.min_sum_scaling_factor
+
+        decoder_class = bp_decoder
         if decoder_options.osd_method:
-            # BPOSD Branch
-            if decoder_options.message_updates == 0:
-                self._decoder = bposd_decoder(
-                    parity_check_matrix=self.parity_check,
-                    max_iter=decoder_options.max_iterations,
-                    channel_probs=self.error_probabilities,
-                    input_vector_type=input_vector_type,
-                    ###################################
-                    bp_method=decoder_options.message_updates,
-                    osd_method=decoder_options.osd_method,
-                    osd_order=decoder_options.osd_order,
-                )
-            else:
-                self._decoder = bposd_decoder(
-                    parity_check_matrix=self.parity_check,
-                    max_iter=decoder_options.max_iterations,
-                    channel_probs=self.error_probabilities,
-                    input_vector_type=input_vector_type,
-                    ###################################
-                    bp_method=decoder_options.message_updates,
-                    ms_scaling_factor=decoder_options.min_sum_scaling_factor,
-                    osd_method=decoder_options.osd_method,
-                    osd_order=decoder_options.osd_order,
-                )
-        else:
-            # BP Branch
-            if decoder_options.message_updates == 0:
-                self._decoder = bp_decoder(
-                    parity_check_matrix=self.parity_check,
-                    max_iter=decoder_options.max_iterations,
-                    channel_probs=self.error_probabilities,
-                    input_vector_type=input_vector_type,
-                    ###################################
-                    bp_method=decoder_options.message_updates,
-                )
-            else:
-                self._decoder = bp_decoder(
-                    parity_check_matrix=self.parity_check,
-                    max_iter=decoder_options.max_iterations,
-                    channel_probs=self.error_probabilities,
-                    input_vector_type=input_vector_type,
-                    ###################################
-                    bp_method=decoder_options.message_updates,
-                    ms_scaling_factor=decoder_options.min_sum_scaling_factor,
-                )
+            decoder_class = bposd_decoder
+            decoder_kwargs["osd_method"] = decoder_options.osd_method
+            decoder_kwargs["osd_order"] = decoder_options.osd_order
+
+        # Worker processes hold copies of the old decoder object, so are replaced too.
+        self.close()
+        self._state.posteriors = None
+        self._state.decoder = decoder_class(**decoder_kwargs)
+        self._state.decoder_class = decoder_class
+        self._state.decoder_kwargs = decoder_kwargs
+        self._state.built_from = copy(decoder_options)
+
+    def decode_batch(
+        self,
+        syndromes: List[List[int]] | NDArray,
+        bit_packed: bool = False,
+        num_workers: int = 1,
+    ) -> Tuple[NDArray[np.bool_], NDArray[np.uint8]]:
+        """Decode a batch of syndromes, one row per shot.
+
+        Parameters
+        ----------
+        syndromes : List[List[int]] | NDArray
+            Array of syndromes of dimension (num_shots * num_detectors).
+        bit_packed : bool, optional
+            Whether the syndromes are bit packed little endian, as returned by
+            `Sampler(..., bit_packed=True)`, by default False. If True, each row is
+            only unpacked right before it is decoded.
+        num_workers : int, optional
+            Number of processes to decode with, by default 1. The LDPC decoders hold
+            the GIL while decoding, so the batch is split across worker processes,
+            each with its own copy of the decoder object. The processes are started on
+            the first such call and reused by later calls with the same number of
+            workers. Call `close`, or use the decoder as a context manager, to shut
+            them down.
+
+        Returns
+        -------
+        Tuple[NDArray[np.bool_], NDArray[np.uint8]]
+            In order:
+                - A boolean array of length num_shots, indicating whether BP
+                  converged on each syndrome.
+                - The error patterns found for each syndrome, of dimension
+                  (num_shots * num_error_mechanisms).
+        """
+        syndromes = np.asarray(syndromes, dtype=np.uint8)
+        num_detectors = self.parity_check.shape[0]
+        if num_workers <= 1 or len(syndromes) <= 1:
+            self._state.posteriors = None
+            return _decode_rows(
+                self._state.decoder, syndromes, num_detectors, bit_packed
+            )
+
+        chunks = np.array_split(syndromes, min(num_workers, len(syndromes)))
+        results = list(
+            self._worker_pool(num_workers).map(
+                _decode_rows_in_worker,
+                chunks,
+                [num_detectors] * len(chunks),
+                [bit_packed] * len(chunks),
+            )
+        )
+
+        return (
+            np.concatenate([converged for converged, _ in results]),
+            np.concatenate([error_patterns for _, error_patterns in results]),
+        )
+
+    def _decode(self, syndrome: NDArray) -> NDArray:
+        """Decode a single syndrome with the decoder object, and return the error
+        pattern it terminated on."""
+        self._state.posteriors = None
+        return self._state.decoder.decode(syndrome)
+
+    def _worker_pool(self, num_workers: int) -> ProcessPoolExecutor:
+        """Return worker processes for `decode_batch`, starting them if there are none
+        of the given number already."""
+        worker_pool = self._state.worker_pool
+        if worker_pool is None or worker_pool.num_workers != num_workers:
+            self.close()
+            worker_pool = self._state.worker_pool = _WorkerPool(
+                executor=ProcessPoolExecutor(
+                    max_workers=num_workers,
+                    initializer=_initialise_worker,
+                    initargs=(self._state.decoder_class, self._state.decoder_kwargs),
+                ),
+                num_workers=num_workers,
+            )
+        return worker_pool.executor
+
+    def close(self) -> None:
+        """Shut down the worker processes started by `decode_batch`, if any."""
+        worker_pool = self._state.worker_pool
+        if worker_pool is not None:
+            worker_pool.executor.shutdown()
+            self._state.worker_pool = None
+
+    def __enter__(self) -> "LDPCBeliefPropagationDecoder":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def logical_failures(
+        self,
+        error_patterns: NDArray,
+        logicals: List[List[bool]] | NDArray,
+        bit_packed: bool = False,
+    ) -> NDArray[np.bool_]:
+        """Batched version of `is_logical_failure`: for each row of error_patterns,
+        check whether it triggers the same logical pattern as the matching row of
+        logicals.
+
+        Parameters
+        ----------
+        error_patterns : NDArray
+            Error patterns of dimension (num_shots * num_error_mechanisms).
+        logicals : List[List[bool]] | NDArray
+            Logical patterns to compare to, of dimension (num_shots * num_logicals).
+        bit_packed : bool, optional
+            Whether the logicals are bit packed little endian, as returned by
+            `Sampler(..., bit_packed=True)`, by default False. If True, the logical
+            flips are packed the same way and compared byte by byte.
+
+        Returns
+        -------
+        NDArray[np.bool_]
+            Boolean array of length num_shots, True where a logical failure occurred.
+        """
+        logical_flips = packed_mod2_matmul(
+            self._checks.logical_check_packed, pack_rows(error_patterns)
+        )
+        if bit_packed:
+            logical_flips = np.packbits(logical_flips, axis=1, bitorder="little")
+        logicals = np.asarray(logicals, dtype=np.uint8).reshape(logical_flips.shape)
+        return np.any(logical_flips != logicals, axis=1)
 
     def is_logical_failure(
-        self, error_pattern: List[int] | NDArray, logical: bool
+        self, error_pattern: List[int] | NDArray, logical: bool | List[int] | NDArray
     ) -> bool:
         """Given a specific logical that relates to a physical error event,
         check if the error pattern triggers the same logical pattern.
@@ -232,10 +445,11 @@ class LDPCBeliefPropagationDecoder(Decoder, ABC):
 
         Parameters
         ----------
-        error_pattern : List[int]
+        error_pattern : List[int] | NDArray
             An error pattern to check.
-        logical : List[int]
-            Logical error pattern to compare to.
+        logical : bool | List[int] | NDArray
+            Logical error pattern to compare to; a single bool when the circuit has
+            one logical observable.
 
         Returns
         -------
@@ -243,12 +457,16 @@ class LDPCBeliefPropagationDecoder(Decoder, ABC):
             Whether or not the input error pattern results
             in the same logical pattern as logical.
         """
-        if [
-            sum(x * y for x, y in zip(log, error_pattern)) % 2
-            for log in self.logical_check
-        ] != logical:
-            return True
-        return False
+        error_pattern = np.asarray(error_pattern, dtype=np.uint8)
+        logical_pattern = np.asarray(logical, dtype=np.uint8)
+        if self._checks.logical_support is not None:
+            logical_flip = (
+                np.count_nonzero(error_pattern[self._checks.logical_support]) & 1
+            )
+            return bool(logical_flip != logical_pattern.reshape(-1)[0])
+
+        logical_flips = (self._checks.logical_check_csr @ error_pattern) & 1
+        return bool(np.any(logical_flips != logical_pattern))
 
     @property
     def num_iterations(self) -> int:
@@ -258,7 +476,7 @@ class LDPCBeliefPropagationDecoder(Decoder, ABC):
         -------
         int
         """
-        return self._decoder.iter
+        return self._state.decoder.iter
 
     @property
     def posterior_log_probability_odds(self) -> List[float]:
@@ -270,33 +488,45 @@ class LDPCBeliefPropagationDecoder(Decoder, ABC):
         List[float]
             Posterior log probability odds.
         """
-        return self._decoder.log_prob_ratios
+        return self._state.decoder.log_prob_ratios
 
     @property
-    def posterior_probability_odds(self) -> List[float]:
-        """Return the list of posterior probability odds after the BP algorithm
+    def posterior_probability_odds(self) -> NDArray[np.float64]:
+        """Return the array of posterior probability odds after the BP algorithm
         has ran. Returns all 1 if no decoding has taken place.
 
         Returns
         -------
-        List[float]
+        NDArray[np.float64]
             Posterior probability odds.
         """
-        return list(1 / np.exp(self.posterior_log_probability_odds))
+        return self._posteriors()[1].copy()
 
     @property
-    def posterior_probabilities(self) -> List[float]:
-        """Return the list of posterior probabilities after the BP algorithm
+    def posterior_probabilities(self) -> NDArray[np.float64]:
+        """Return the array of posterior probabilities after the BP algorithm
         has ran. Returns all 0.5 if no decoding has taken place.
 
         Returns
         -------
-        List[float]
+        NDArray[np.float64]
             Posterior probabilities.
         """
-        posterior_odds = self.posterior_probability_odds
-
-        return [x / (1 + x) for x in posterior_odds]
+        return self._posteriors()[2].copy()
+
+    def _posteriors(self) -> Tuple[NDArray, NDArray, NDArray]:
+        """Return the posterior log probability odds, probability odds and
+        probabilities, in that order. They are computed once per decode: decoding
+        through this class's methods clears them, but decoding with the raw `decoder`
+        object does not."""
+        if self._state.posteriors is None:
+            log_odds = np.asarray(self.posterior_log_probability_odds)
+            with np.errstate(over="ignore"):
+                odds = np.exp(-log_odds)
+            # expit stays exact where the odds overflow or underflow
+            probabilities = expit(-log_odds)
+            self._state.posteriors = (log_odds, odds, probabilities)
+        return self._state.posteriors
 
     @property
     def converged(self) -> bool:
@@ -306,4 +536,4 @@ class LDPCBeliefPropagationDecoder(Decoder, ABC):
         -------
         bool
         """
-        return bool(self._decoder.converge)
+        return bool(self._state.decoder.converge)
@@ -11,7 +11,6 @@ from dotg.decoders._belief_propagation_base_class import (
     LDPCBeliefPropagationDecoder,
     LDPCDecoderOptions,
 )
-from dotg.utilities import Sampler
 
 
 class BPOSD(LDPCBeliefPropagationDecoder):
@@ -42,17 +41,20 @@ class BPOSD(LDPCBeliefPropagationDecoder):
             raise ValueError("You must provide an OSD method to use BPOSD.")
 
     def decode_syndrome(self, syndrome: List[int] | NDArray) -> NDArray:
-        return self._decoder.decode(np.asarray(syndrome))
+        return self._decode(np.ascontiguousarray(syndrome, dtype=np.uint8))
 
     def logical_error(
-        self, num_shots: int | float, exclude_empty: bool = False
+        self, num_shots: int | float, exclude_empty: bool = False, num_workers: int = 1
     ) -> float:
-        sampler = Sampler(circuit=self.circuit)
-        syndromes, logicals = sampler(num_shots=num_shots, exclude_empty=exclude_empty)
-
-        logical_failures = 0
-        for syndrome, logical in zip(syndromes, logicals):
-            error_pattern = self.decode_syndrome(syndrome=syndrome)
-            logical_failures += self.is_logical_failure(error_pattern, logical)
+        syndromes, logicals = self.sampler(
+            num_shots=num_shots, exclude_empty=exclude_empty, bit_packed=True
+        )
+
+        _, error_patterns = self.decode_batch(
+            syndromes, bit_packed=True, num_workers=num_workers
+        )
+        logical_failures = np.count_nonzero(
+            self.logical_failures(error_patterns, logicals, bit_packed=True)
+        )
 
         return logical_failures / num_shots
@@ -3,6 +3,7 @@ the pymatching package: https://github.com/oscarhiggott/PyMatching"""
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import List
 
 import numpy as np
@@ -11,6 +12,23 @@ from numpy.typing import NDArray
 from pymatching import Matching
 
 from dotg.decoders._decoder_base_class import Decoder
+from dotg.utilities._check_matrices import _CircuitKey
+
+# logical_error samples and decodes at most this many shots at a time, which bounds its
+# memory use regardless of the number of shots requested.
+_SHOTS_PER_BATCH = 2**15
+
+
+@lru_cache(maxsize=32)
+def _cached_matching(key: _CircuitKey) -> Matching:
+    matching = Matching.from_detector_error_model(
+        key.circuit.detector_error_model(
+            approximate_disjoint_errors=True, decompose_errors=True
+        )
+    )
+    # Cache the graph for speed
+    matching.decode_batch(np.zeros((1, key.circuit.num_detectors), dtype=np.uint8))
+    return matching
 
 
 class MinimumWeightPerfectMatching(Decoder):
@@ -34,13 +52,13 @@ class MinimumWeightPerfectMatching(Decoder):
     def __init__(self, circuit: stim.Circuit) -> None:
         super().__init__(circuit=circuit)
         self.sampler = circuit.compile_detector_sampler()
+        # Scratch arrays that logical_error samples into, kept so that repeated calls
+        # reuse the same memory. They grow to the largest batch of shots requested.
+        self._syndrome_buffer = np.empty((0, circuit.num_detectors), dtype=np.bool_)
+        self._observable_buffer = np.empty((0, circuit.num_observables), dtype=np.bool_)
 
         try:
-            self.matching = Matching.from_detector_error_model(
-                self.circuit.detector_error_model(
-                    approximate_disjoint_errors=True, decompose_errors=True
-                )
-            )
+            self.matching = _cached_matching(_CircuitKey(self.circuit))
         except ValueError as exc:
             if "Failed to decompose" in exc.args[0]:
                 raise ValueError(
@@ -52,11 +70,40 @@ class MinimumWeightPerfectMatching(Decoder):
         return self.matching.decode(syndrome)
 
     def logical_error(self, num_shots: int | float) -> float:
-        syndrome_batch, observables = self.sampler.sample(
-            shots=int(num_shots), separate_observables=True
-        )
-        # Cache the graph for speed
-        self.matching.decode_batch(syndrome_batch[0:1, :])
+        num_shots = int(num_shots)
+        if num_shots == 0:
+            return 0.0
+        batch_size = min(num_shots, _SHOTS_PER_BATCH)
+        if self._syndrome_buffer.shape[0] < batch_size:
+            self._syndrome_buffer = np.empty(
+                (batch_size, self.circuit.num_detectors), dtype=np.bool_
+            )
+            self._observable_buffer = np.empty(
+                (batch_size, self.circuit.num_observables), dtype=np.bool_
+            )
+
+        errors = 0
+        for start in range(0, num_shots, batch_size):
+            shots = min(batch_size, num_shots - start)
+            syndrome_batch, observables = self.sampler.sample(
+                shots=shots,
+                separate_observables=True,
+                dets_out=self._syndrome_buffer[:shots],
+                obs_out=self._observable_buffer[:shots],
+            )
+            errors += self._count_logical_errors(syndrome_batch, observables)
+        return errors / num_shots
 
-        predicted_observables = self.matching.decode_batch(syndrome_batch)
-        return np.sum(np.any(predicted_observables != observables, axis=1)) / num_shots
+    def _count_logical_errors(self, syndromes: NDArray, observables: NDArray) -> int:
+        """Decode a batch of sampled syndromes and count the logical errors."""
+        # An empty syndrome decodes to no observable flips, so only the rest are decoded
+        nontrivial = np.any(syndromes, axis=1)
+        predicted_observables = self.matching.decode_batch(syndromes[nontrivial])
+        mismatch = np.bitwise_xor(
+            predicted_observables.view(np.uint8),
+            observables[nontrivial].view(np.uint8),
+        )
+        return int(
+            np.count_nonzero(np.any(mismatch, axis=1))
+            + np.count_nonzero(np.any(observables[~nontrivial], axis=1))
+        )
@@ -2,11 +2,24 @@
 
 from __future__ import annotations
 
-from typing import Optional, Tuple, TypeAlias
+import inspect
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeAlias,
+)
 
+import numpy as np
 import stim
 
-from dotg.utilities import get_circuit_layers
 from dotg.utilities.stim_assets import (
     MeasureAndReset,
     MeasurementGates,
@@ -21,9 +34,123 @@ from dotg.utilities.stim_assets import (
 NoiseParam: TypeAlias = float | Tuple[float]
 NoiseChannel: TypeAlias = TwoQubitNoiseChannels | OneQubitNoiseChannels
 
+# Gate names of each kind, as sets, for the per-instruction lookups in permute_circuit.
+_MEASURE_AND_RESET = frozenset(MeasureAndReset.members())
+_MEASUREMENT_GATES = frozenset(MeasurementGates.members())
+_ONE_QUBIT_GATES = frozenset(OneQubitGates.members())
+_TWO_QUBIT_GATES = frozenset(TwoQubitGates.members())
+_RESET_GATES = frozenset(ResetGates.members())
+_ONE_QUBIT_NOISE_CHANNELS = frozenset(OneQubitNoiseChannels.members())
+_TWO_QUBIT_NOISE_CHANNELS = frozenset(TwoQubitNoiseChannels.members())
+_PAULI_CHANNELS = frozenset(
+    {OneQubitNoiseChannels.PAULI_CHANNEL_1, TwoQubitNoiseChannels.PAULI_CHANNEL_2}
+)
+_PAULI_CHANNEL_ARITIES = frozenset({3, 15})
+# How characters with a meaning in stim programs are escaped in instruction tags.
+_TAG_ESCAPES = (("\\", "\\B"), ("]", "\\C"), ("\r", "\\r"), ("\n", "\\n"))
+
 # pylint: disable=unused-argument, too-many-instance-attributes
 
 
+def _args_text(arg: Optional[NoiseParam | List[float]]) -> str:
+    """Write gate arguments the way they appear in a stim program, without rounding."""
+    args = arg if isinstance(arg, (tuple, list)) else [] if arg is None else [arg]
+    return f"({', '.join(repr(float(x)) for x in args)})" if args else ""
+
+
+def _tag_text(tag: str) -> str:
+    """Write an instruction tag the way it appears in a stim program, escaped and in
+    square brackets, or as nothing if there is no tag."""
+    if not tag:
+        return ""
+    for char, escaped in _TAG_ESCAPES:
+        tag = tag.replace(char, escaped)
+    return f"[{tag}]"
+
+
+def _target_text(target: int | stim.GateTarget) -> str:
+    """Write a gate target the way it appears in a stim program."""
+    if isinstance(target, int):
+        return str(target)
+    if target.is_combiner:
+        return "*"
+    if target.is_measurement_record_target:
+        return f"rec[{target.value}]"
+    if target.is_sweep_bit_target:
+        return f"sweep[{target.value}]"
+    inverted = "!" if target.is_inverted_result_target else ""
+    pauli = "" if target.pauli_type == "I" else target.pauli_type
+    return f"{inverted}{pauli}{target.value}"
+
+
+def _instruction_text(
+    instruction: stim.CircuitInstruction | stim.CircuitRepeatBlock,
+) -> str:
+    """Write an instruction as stim program text, keeping its gate arguments exact."""
+    # Instruction tags were added in stim 1.15; older releases have no tag to keep.
+    header = f"{instruction.name}{_tag_text(getattr(instruction, 'tag', ''))}"
+    if isinstance(instruction, stim.CircuitRepeatBlock):
+        body = "\n".join(_instruction_text(x) for x in instruction.body_copy())
+        return f"{header} {instruction.repeat_count} {{\n{body}\n}}"
+    targets = " ".join(_target_text(x) for x in instruction.targets_copy())
+    return f"{header}{_args_text(instruction.gate_args_copy())} {targets}"
+
+
+class _InstructionLine(NamedTuple):
+    """An instruction read from a circuit, along with its stim program text."""
+
+    instruction: stim.CircuitInstruction | stim.CircuitRepeatBlock
+    line: str
+
+
+def _circuit_text(circuit: stim.Circuit) -> Tuple[List[_InstructionLine], Set[int]]:
+    """Read each instruction of a circuit and write it as text, and collect the indices
+    of the qubits the circuit defines with QUBIT_COORDS entries."""
+    instructions = []
+    qubit_indices = set()
+    for instr in circuit:
+        instructions.append(_InstructionLine(instr, _instruction_text(instr)))
+        if instr.name == StimDecorators.QUBIT_COORDS:
+            qubit_indices.add(instr.targets_copy()[0].value)
+    return instructions, qubit_indices
+
+
+class _CircuitBuilder:
+    """Stand-in for a stim circuit that records appended instructions as lines of a stim
+    program, so the circuit can be parsed in one call rather than built up over many
+    `append` calls. Gate arguments are written out in full, since stim rounds them when
+    printing a circuit. When parsing, stim merges directly adjacent instructions with
+    the same name and arguments, such as the noise on back-to-back gates, into one."""
+
+    __slots__ = ("lines",)
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+
+    def append(
+        self,
+        name: str | stim.CircuitInstruction | stim.CircuitRepeatBlock,
+        targets: Iterable[int | stim.GateTarget] = (),
+        arg: Optional[NoiseParam | List[float]] = None,
+    ) -> None:
+        """Record an instruction, with the same arguments as `stim.Circuit.append`."""
+        if isinstance(name, str):
+            targets_text = " ".join(_target_text(x) for x in targets)
+            self.lines.append(f"{name}{_args_text(arg)} {targets_text}")
+        else:
+            self.lines.append(_instruction_text(name))
+
+    def to_circuit(self) -> stim.Circuit:
+        """Parse the recorded instructions into a stim circuit."""
+        return stim.Circuit("\n".join(self.lines))
+
+
+# permute_circuit writes to a _CircuitBuilder, so the NoiseModel instruction handlers
+# take either form of circuit.
+_Circuit: TypeAlias = stim.Circuit | _CircuitBuilder
+_InstructionHandler: TypeAlias = Callable[[_Circuit, stim.CircuitInstruction], _Circuit]
+
+
 class NoiseModel:
     """Class that takes in specific noise channels and corresponding strengths, to be
     applied to a circuit.
@@ -98,6 +225,22 @@ class NoiseModel:
 
         self._measurement_noise_parameter = measurement_noise
 
+        # How permute_circuit handles each kind of instruction; any instruction not
+        # listed here (e.g. a stim decorator, or a gate this model adds no noise to) is
+        # copied over unchanged.
+        noisy_gates = (
+            (_ONE_QUBIT_GATES if self._one_qubit_gate_noise_parameter else frozenset())
+            | (_TWO_QUBIT_GATES if self._two_qubit_gate_noise_parameter else frozenset())
+            | (_RESET_GATES if self._reset_noise_parameter else frozenset())
+        )
+        self._instruction_handlers: Dict[str, _InstructionHandler] = {
+            **dict.fromkeys(noisy_gates, self._noisy_gate_instruction),
+            **dict.fromkeys(_MEASUREMENT_GATES, self._measurement_instruction),
+            **dict.fromkeys(_MEASURE_AND_RESET, self._measurement_and_reset_instruction),
+        }
+        # The last circuit given to permute_circuit, and the noisy circuit it returned.
+        self._last_permuted: Optional[Tuple[stim.Circuit, stim.Circuit]] = None
+
     def _is_legal_noise_model(
         self,
         two_qubit_gate_noise: Optional[Tuple[NoiseChannel, NoiseParam]] = None,
@@ -109,64 +252,68 @@ class NoiseModel:
         """Run tests on all the inputs to make sure it's a legal noise model."""
 
         # Check quantum gate channels first
-        for _arg_name, _arg in locals().items():
-            if (_arg in (None, self)) or _arg_name == "measurement_noise":
-                continue
-            _channel, _param = _arg
-            if (
-                _arg_name == "two_qubit_gate_noise"
-                and _channel not in TwoQubitNoiseChannels.members()
-            ) or (
-                _arg_name != "two_qubit_gate_noise"
-                and _channel not in OneQubitNoiseChannels.members()
-            ):
-                raise ValueError(f"Invalid gate/noise pairing: {_arg_name} - {_channel}")
-
-            if isinstance(_param, float | int):
-                if not 0 <= _param < 1:
-                    raise ValueError(
-                        """Invalid noise parameter passed for channel"""
-                        f""" {_channel}: {_param}"""
-                    )
-            if _channel in [
-                OneQubitNoiseChannels.PAULI_CHANNEL_1,
-                TwoQubitNoiseChannels.PAULI_CHANNEL_2,
-            ] and ((not isinstance(_param, tuple)) or (len(_param) not in [3, 15])):
-                raise ValueError(
-                    "stim noise channels `PAULI_CHANNEL_1` and `PAULI_CHANNEL_2` "
-                    "must be accompanied with tuple of floats of lengths 3 and 15 "
-                    "respectively."
-                )
+        self._is_legal_gate_noise(
+            "two_qubit_gate_noise", two_qubit_gate_noise, _TWO_QUBIT_NOISE_CHANNELS
+        )
+        self._is_legal_gate_noise(
+            "one_qubit_gate_noise", one_qubit_gate_noise, _ONE_QUBIT_NOISE_CHANNELS
+        )
+        self._is_legal_gate_noise("reset_noise", reset_noise, _ONE_QUBIT_NOISE_CHANNELS)
+        self._is_legal_gate_noise("idle_noise", idle_noise, _ONE_QUBIT_NOISE_CHANNELS)
 
         if not 0 <= measurement_noise < 1:
             raise ValueError(
                 f"Invalid measurement flip value given: {measurement_noise}"
             )
 
+    @staticmethod
+    def _is_legal_gate_noise(
+        arg_name: str,
+        noise: Optional[Tuple[NoiseChannel, NoiseParam]],
+        allowed_channels: FrozenSet[str],
+    ) -> None:
+        """Check a single gate noise instruction, if one was given."""
+        if noise is None:
+            return
+        _channel, _param = noise
+        if _channel not in allowed_channels:
+            raise ValueError(f"Invalid gate/noise pairing: {arg_name} - {_channel}")
+
+        if isinstance(_param, float | int):
+            if not 0 <= _param < 1:
+                raise ValueError(
+                    """Invalid noise parameter passed for channel"""
+                    f""" {_channel}: {_param}"""
+                )
+        if _channel in _PAULI_CHANNELS and (
+            (not isinstance(_param, tuple))
+            or (len(_param) not in _PAULI_CHANNEL_ARITIES)
+        ):
+            raise ValueError(
+                "stim noise channels `PAULI_CHANNEL_1` and `PAULI_CHANNEL_2` "
+                "must be accompanied with tuple of floats of lengths 3 and 15 "
+                "respectively."
+            )
+
     def _measurement_instruction(
-        self, circuit: stim.Circuit, instruction: stim.CircuitInstruction
-    ) -> stim.Circuit:
+        self, circuit: _Circuit, instruction: stim.CircuitInstruction
+    ) -> _Circuit:
         """Add a measurement instruction (with noise) to the end of the given circuit.
-        If the `instruction` kwarg is actually a measurement and reset instruction, the
-        relevant method is called instead.
+        Measurement and reset instructions are handled by
+        `_measurement_and_reset_instruction`.
 
         Parameters
         ----------
-        circuit : stim.Circuit
+        circuit : stim.Circuit | _CircuitBuilder
             stim circuit
         instruction : stim.CircuitInstruction
             measurement instruction.
 
         Returns
         -------
-        stim.Circuit
+        stim.Circuit | _CircuitBuilder
             The circuit with the measurement instruction appended.
         """
-        if instruction.name == "MR":
-            return self._measurement_and_reset_instruction(
-                circuit=circuit, instruction=instruction
-            )
-
         circuit.append(
             name=instruction.name,
             targets=instruction.targets_copy(),
@@ -175,87 +322,92 @@ class NoiseModel:
         return circuit
 
     def _measurement_and_reset_instruction(
-        self, circuit: stim.Circuit, instruction: stim.CircuitInstruction
-    ) -> stim.Circuit:
+        self, circuit: _Circuit, instruction: stim.CircuitInstruction
+    ) -> _Circuit:
         """Add a measurement and reset instruction (with noise) to a stim circuit, but
         in separate steps and with a TICK command in beteween.
 
         Parameters
         ----------
-        circuit : stim.Circuit
+        circuit : stim.Circuit | _CircuitBuilder
             stim circuit
         instruction : stim.CircuitInstruction
             measurement and reset stim instruction.
 
         Returns
         -------
-        stim.Circuit
+        stim.Circuit | _CircuitBuilder
             The circuit with the measurement and reset instruction appended.
         """
+        targets = instruction.targets_copy()
         circuit.append(
             name=MeasurementGates.MZ,
-            targets=instruction.targets_copy(),
+            targets=targets,
             arg=self._measurement_noise_parameter,
         )
         circuit.append(name=StimDecorators.TICK)
-        circuit.append(name=ResetGates.RZ, targets=instruction.targets_copy())
+        circuit.append(name=ResetGates.RZ, targets=targets)
         if self._reset_noise_parameter:
             circuit.append(
                 name=self._reset_noise_channel,
-                targets=instruction.targets_copy(),
+                targets=targets,
                 arg=self._reset_noise_parameter,
             )
         return circuit
 
     def _gate_instruction(
-        self, circuit: stim.Circuit, instruction: stim.CircuitInstruction
-    ) -> stim.Circuit:
+        self, circuit: _Circuit, instruction: stim.CircuitInstruction
+    ) -> _Circuit:
         """Add a noise entry to a stim circuit right after a gate instruction.
 
         Parameters
         ----------
-        circuit : stim.Circuit
+        circuit : stim.Circuit | _CircuitBuilder
             stim Circuit.
         instruction : stim.CircuitInstruction
             Instruction explaining what gate has been applied and to which qubits.
 
         Returns
         -------
-        stim.Circuit
+        stim.Circuit | _CircuitBuilder
             The circuit with the gate now applied noisily.
         """
-        if (
-            instruction.name in OneQubitGates.members()
-            and self._one_qubit_gate_noise_parameter
-        ):
+        name, targets = instruction.name, instruction.targets_copy()
+        if name in _ONE_QUBIT_GATES and self._one_qubit_gate_noise_parameter:
             circuit.append(
                 name=self._one_qubit_gate_noise_channel,
-                targets=instruction.targets_copy(),
+                targets=targets,
                 arg=self._one_qubit_gate_noise_parameter,
             )
 
-        if (
-            instruction.name in TwoQubitGates.members()
-            and self._two_qubit_gate_noise_parameter
-        ):
+        if name in _TWO_QUBIT_GATES and self._two_qubit_gate_noise_parameter:
             circuit.append(
                 name=self._two_qubit_gate_noise_channel,
-                targets=instruction.targets_copy(),
+                targets=targets,
                 arg=self._two_qubit_gate_noise_parameter,
             )
 
-        if instruction.name in ResetGates.members() and self._reset_noise_parameter:
+        if name in _RESET_GATES and self._reset_noise_parameter:
             circuit.append(
                 name=self._reset_noise_channel,
-                targets=instruction.targets_copy(),
+                targets=targets,
                 arg=self._reset_noise_parameter,
             )
 
         return circuit
 
-    def add_idle_noise(self, circuit: stim.Circuit) -> stim.Circuit:
-        """Add idle noise to a circuit. This method divides the circuit into congruent
-        layers (equivalently, timeslices) by splitting at each "TICK" instruction. For
+    def _noisy_gate_instruction(
+        self, circuit: _Circuit, instruction: stim.CircuitInstruction
+    ) -> _Circuit:
+        """Add a gate instruction to a stim circuit, followed by its noise."""
+        circuit.append(instruction)
+        return self._gate_instruction(circuit=circuit, instruction=instruction)
+
+    def add_idle_noise(
+        self, circuit: stim.Circuit, qubit_indices: Optional[Set[int]] = None
+    ) -> stim.Circuit:
+        """Add idle noise to a circuit. This method walks the circuit in congruent
+        layers (equivalently, timeslices) that end at each "TICK" instruction. For
         each circuit layer the number of qubits acted upon is found, and any qubits that
         are not involved in the layer have idle noise applied to them at the end of the
         timeslice.
@@ -263,6 +415,14 @@ class NoiseModel:
         Total qubit count is found by looking for qubit definitions - QUBIT_COORDS
         entries in the full circuit.
 
+        Parameters
+        ----------
+        circuit : stim.Circuit
+            stim circuit to add idle noise to.
+        qubit_indices : Set[int], optional
+            Indices of the qubits defined by the circuit's QUBIT_COORDS entries, by
+            default None. If None, they are read from the circuit.
+
         Returns
         -------
         stim.Circuit
@@ -273,11 +433,12 @@ class NoiseModel:
         ValueError
             If the circuit does not have qubit coordinate definitions.
         """
-        qubit_indices = set(
-            next(x.value for x in line.targets_copy())
-            for line in circuit
-            if line.name == StimDecorators.QUBIT_COORDS
-        )
+        if qubit_indices is None:
+            qubit_indices = set(
+                next(x.value for x in line.targets_copy())
+                for line in circuit
+                if line.name == StimDecorators.QUBIT_COORDS
+            )
         if not qubit_indices:
             raise ValueError(
                 "You must define qubit entries for idle noise to be applied, "
@@ -285,29 +446,42 @@ class NoiseModel:
                 "in the experiment. Add QUBIT_COORDS commands to the beginning of the"
                 " circuit."
             )
-        circuit_layers = get_circuit_layers(circuit=circuit)
+        # Qubits are tracked as boolean masks over the qubit indices, which are small
+        # non-negative integers.
+        num_qubits = max(qubit_indices) + 1
+        defined_qubits = np.zeros(num_qubits, dtype=bool)
+        defined_qubits[list(qubit_indices)] = True
+
+        # Timeslices are copied straight from the input circuit as each closing TICK
+        # (or the final instruction) is reached, rather than splitting the circuit
+        # into separate layer circuits first.
         final_circuit = stim.Circuit()
-        for timeslice in circuit_layers:
-            if len(timeslice) == 0:
+        last_index = len(circuit) - 1
+        slice_start = 0
+        slice_targets: List[int] = []
+        for index, instruction in enumerate(circuit):
+            slice_targets.extend(x.value for x in instruction.targets_copy())
+            if instruction.name != StimDecorators.TICK and index != last_index:
                 continue
-            active_qubits = set(
-                x.value
-                for instr in timeslice
-                for x in instr.targets_copy()
-                if instr.name
-            )
-
-            idle_qubits = qubit_indices - active_qubits
-            if idle_qubits and self._idle_noise_parameter:
-                new_timeslice, tick = timeslice[0:-1], timeslice[-1]
-                new_timeslice.append(
+            target_values = np.asarray(slice_targets, dtype=np.int64)
+            active_qubits = np.zeros(num_qubits, dtype=bool)
+            active_qubits[
+                target_values[(target_values >= 0) & (target_values < num_qubits)]
+            ] = True
+
+            idle_qubits = np.flatnonzero(defined_qubits & ~active_qubits)
+            if idle_qubits.size and self._idle_noise_parameter:
+                # Idle noise goes in just before the timeslice's closing instruction
+                final_circuit += circuit[slice_start:index]
+                final_circuit.append(
                     name=self._idle_noise_channel,
-                    targets=idle_qubits,
+                    targets=idle_qubits.tolist(),
                     arg=self._idle_noise_parameter,
                 )
-                new_timeslice.append(name=tick)
-                timeslice = new_timeslice
-            final_circuit += timeslice
+                final_circuit.append(instruction)
+            else:
+                final_circuit += circuit[slice_start : index + 1]
+            slice_start, slice_targets = index + 1, []
         return final_circuit
 
     def permute_circuit(self, circuit: stim.Circuit) -> stim.Circuit:
@@ -321,31 +495,100 @@ class NoiseModel:
         Returns
         -------
         stim.Circuit
-            The same circuit with noise applied appropriately.
+            The same circuit with noise applied appropriately. The model keeps its
+            result for the last circuit it was given, so applying it to an identical
+            circuit again returns a copy of that result.
         """
+        if self._last_permuted is None or self._last_permuted[0] != circuit:
+            self._last_permuted = (
+                circuit.copy(),
+                self._permute_instructions(*_circuit_text(circuit)),
+            )
+        return self._last_permuted[1].copy()
 
-        noisy_circuit = stim.Circuit()
-        for instr in circuit:
-            if instr.name in MeasureAndReset.members():
-                self._measurement_and_reset_instruction(
-                    circuit=noisy_circuit, instruction=instr
-                )
-                continue
+    def permute_circuit_batch(
+        self, circuit: stim.Circuit, param_overrides: List[Dict[str, Any]]
+    ) -> List[stim.Circuit]:
+        """Apply several variations of this noise model to the same noiseless circuit,
+        e.g. for a sweep over noise strengths. The circuit is only read once, and each
+        noisy circuit is then written from that reading.
 
-            if instr.name in MeasurementGates.members():
-                noisy_circuit = self._measurement_instruction(
-                    circuit=noisy_circuit, instruction=instr
-                )
-                continue
-
-            noisy_circuit.append(instr)
+        Parameters
+        ----------
+        circuit : stim.Circuit
+            An input noiseless circuit.
+        param_overrides : List[Dict[str, Any]]
+            One dictionary per output circuit, of NoiseModel keyword arguments (e.g.
+            `{"measurement_noise": 1e-3}`) that replace this model's values. An empty
+            dictionary applies this model as it is.
 
-            if instr.name in StimDecorators.members():
-                continue
+        Raises
+        ------
+        TypeError
+            If noise is overridden and this model's class cannot be built from
+            NoiseModel keyword arguments, e.g. DepolarizingNoise.
 
-            noisy_circuit = self._gate_instruction(
-                circuit=noisy_circuit, instruction=instr
+        Returns
+        -------
+        List[stim.Circuit]
+            The noisy circuits, in the order of `param_overrides`.
+        """
+        noise_model_kwargs = self._noise_model_kwargs()
+        if any(param_overrides):
+            try:
+                inspect.signature(type(self)).bind(**noise_model_kwargs)
+            except TypeError as exc:
+                raise TypeError(
+                    f"{type(self).__name__} cannot be built from NoiseModel keyword "
+                    "arguments, so its noise cannot be overridden."
+                ) from exc
+
+        instructions, qubit_indices = _circuit_text(circuit)
+        noisy_circuits = []
+        for overrides in param_overrides:
+            noise_model = (
+                type(self)(**{**noise_model_kwargs, **overrides}) if overrides else self
+            )
+            noisy_circuits.append(
+                noise_model._permute_instructions(  # pylint: disable=protected-access
+                    instructions, qubit_indices
+                )
             )
+        return noisy_circuits
+
+    def _noise_model_kwargs(self) -> Dict[str, Any]:
+        """Return the keyword arguments that build a NoiseModel equal to this one."""
+        return {
+            "two_qubit_gate_noise": (
+                self._two_qubit_gate_noise_channel,
+                self._two_qubit_gate_noise_parameter,
+            ),
+            "one_qubit_gate_noise": (
+                self._one_qubit_gate_noise_channel,
+                self._one_qubit_gate_noise_parameter,
+            ),
+            "reset_noise": (self._reset_noise_channel, self._reset_noise_parameter),
+            "idle_noise": (self._idle_noise_channel, self._idle_noise_parameter),
+            "measurement_noise": self._measurement_noise_parameter,
+        }
+
+    def _permute_instructions(
+        self, instructions: List[_InstructionLine], qubit_indices: Set[int]
+    ) -> stim.Circuit:
+        """Apply this noise model to a circuit given as the output of `_circuit_text`."""
+        # Instructions are collected as text and parsed once at the end, which is far
+        # cheaper than appending them to a stim circuit one by one.
+        noisy_circuit = _CircuitBuilder()
+        for instr, line in instructions:
+            handler = self._instruction_handlers.get(instr.name)
+            if handler is None:
+                noisy_circuit.lines.append(line)
+            else:
+                handler(noisy_circuit, instr)
+
         if self._idle_noise_parameter:
-            return self.add_idle_noise(noisy_circuit)
-        return noisy_circuit
+            return self.add_idle_noise(
+                noisy_circuit.to_circuit(), qubit_indices=qubit_indices
+            )
+        return noisy_circuit.to_circuit()
+
@@ -1,6 +1,9 @@
 """Utility package. Helpful functionality that doesn't have an obvious home goes here."""
 
-from dotg.utilities._check_matrices import CircuitUnderstander
+from dotg.utilities._check_matrices import (
+    CircuitUnderstander,
+    cached_circuit_understander,
+)
 from dotg.utilities._circuit_layers import get_circuit_layers
 from dotg.utilities._syndrome_sampler import Sampler
 from dotg.utilities._threshold import ThresholdHeuristic
@@ -0,0 +1,77 @@
+"""This module provides functions for mod 2 arithmetic on bit packed binary arrays."""
+
+from typing import List
+
+import numpy as np
+from numpy.typing import NDArray
+
+WORD_SIZE = 64
+
+
+def pack_rows(matrix: List[List[int]] | NDArray) -> NDArray[np.uint64]:
+    """Pack each row of a binary matrix into 64 bit words. Rows are zero padded up to a
+    multiple of 64 bits. A one dimensional input is treated as a single row.
+
+    Parameters
+    ----------
+    matrix : List[List[int]] | NDArray
+        Binary matrix (or vector) to pack.
+
+    Returns
+    -------
+    NDArray[np.uint64]
+        Array of shape (num_rows, ceil(num_columns / 64)).
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.uint8))
+    num_rows, num_columns = matrix.shape
+    num_words = -(-num_columns // WORD_SIZE)
+
+    padded = np.zeros((num_rows, num_words * WORD_SIZE), dtype=np.uint8)
+    padded[:, :num_columns] = matrix
+    return np.packbits(padded, axis=1).view(np.uint64)
+
+
+def word_parity(words: NDArray[np.uint64]) -> NDArray[np.uint8]:
+    """Return the parity of the number of set bits in each 64 bit word, by folding each
+    word onto itself.
+
+    Parameters
+    ----------
+    words : NDArray[np.uint64]
+        Array of 64 bit words.
+
+    Returns
+    -------
+    NDArray[np.uint8]
+        Array of the same shape, with 1 where a word has odd weight and 0 otherwise.
+    """
+    words = np.array(words, dtype=np.uint64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        words ^= words >> np.uint64(shift)
+    return (words & np.uint64(1)).astype(np.uint8)
+
+
+def packed_mod2_matmul(
+    packed_matrix: NDArray[np.uint64], packed_rows: NDArray[np.uint64]
+) -> NDArray[np.uint8]:
+    """Multiply a bit packed binary matrix by each of a batch of bit packed binary
+    vectors, mod 2. Both arguments are expected to have been packed with `pack_rows`.
+
+    Parameters
+    ----------
+    packed_matrix : NDArray[np.uint64]
+        Packed matrix of shape (num_rows, num_words).
+    packed_rows : NDArray[np.uint64]
+        Packed batch of vectors of shape (num_vectors, num_words).
+
+    Returns
+    -------
+    NDArray[np.uint8]
+        Unpacked binary array of shape (num_vectors, num_rows), where row i is the
+        product of the matrix with vector i.
+    """
+    return word_parity(
+        np.bitwise_xor.reduce(
+            packed_rows[:, None, :] & packed_matrix[None, :, :], axis=2
+        )
+    )
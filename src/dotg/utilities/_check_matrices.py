@@ -2,13 +2,15 @@
 logical check matrix, and a vector of individual probabilities for each error 
 mechanism."""
 
-from typing import List, TypeAlias
+from functools import lru_cache
+from typing import List, Tuple, TypeAlias
 
 import numpy as np
 import stim
+from scipy.sparse import csr_matrix
 
 # pylint: disable=invalid-name
-ArrayT: TypeAlias = List[List[float]]
+ArrayT: TypeAlias = csr_matrix
 
 
 class CircuitUnderstander:
@@ -27,11 +29,13 @@ class CircuitUnderstander:
     Attributes
     ----------
     parity_check : ArrayT
-        The parity check matrix of the circuit. Element H[i, j] = 1 iff detector i
-        anticommutes with error mechanism j, and 0 otherwise.
+        The parity check matrix of the circuit, as a sparse uint8 matrix. Element
+        H[i, j] = 1 iff detector i anticommutes with error mechanism j, and 0
+        otherwise. Use `toarray()` for a dense copy.
     logical_check : ArrayT
-        The logical check matrix of the circuit. Element L[i, j] = 1 iff logical
-        observable i anticommutes with error mechanism j, and 0 otherwise.
+        The logical check matrix of the circuit, as a sparse uint8 matrix. Element
+        L[i, j] = 1 iff logical observable i anticommutes with error mechanism j, and 0
+        otherwise.
     error_probabilities : List[float]
         The list of probabilities relating to each error mechanism.
     """
@@ -73,27 +77,89 @@ class CircuitUnderstander:
         probabilities."""
         dem = circuit.detector_error_model(decompose_errors=decompose_errors)
 
-        parity_check = np.zeros((dem.num_detectors, dem.num_errors))
-        logical_check = np.zeros((dem.num_observables, dem.num_errors))
-        error_probabilities = []
+        # Positions of the ones in each matrix are collected first, and each matrix
+        # is then built in one go.
+        detector_rows, detector_columns = [], []
+        logical_rows, logical_columns = [], []
+        error_probabilities: List[float] = []
 
-        for idx, event in enumerate(dem):
+        for event in dem:
             if event.type != "error":
                 continue
 
-            detectors_trigged = [
-                x.val for x in event.targets_copy() if x.is_relative_detector_id()
-            ]
-            logicals_triggered = set(
-                x.val for x in event.targets_copy() if x.is_logical_observable_id()
-            )
-            for detector in detectors_trigged:
-                parity_check[detector, idx] = 1
-            for logical in logicals_triggered:
-                logical_check[logical, idx] = 1
+            error_index = len(error_probabilities)
+            for target in event.targets_copy():
+                if target.is_relative_detector_id():
+                    detector_rows.append(target.val)
+                    detector_columns.append(error_index)
+                elif target.is_logical_observable_id():
+                    logical_rows.append(target.val)
+                    logical_columns.append(error_index)
 
             error_probabilities.append(event.args_copy()[0])
 
-        self.parity_check = list(parity_check)
-        self.logical_check = list(logical_check)
+        self.parity_check = _binary_csr_matrix(
+            detector_rows, detector_columns, shape=(dem.num_detectors, dem.num_errors)
+        )
+        self.logical_check = _binary_csr_matrix(
+            logical_rows, logical_columns, shape=(dem.num_observables, dem.num_errors)
+        )
         self.error_probabilities = error_probabilities
+
+
+def _binary_csr_matrix(
+    rows: List[int], columns: List[int], shape: Tuple[int, int]
+) -> ArrayT:
+    """Build a sparse binary matrix with ones at the given positions. Positions listed
+    more than once still hold a one."""
+    matrix = csr_matrix(
+        (np.ones(len(rows), dtype=np.uint8), (rows, columns)), shape=shape
+    )
+    matrix.data[:] = 1
+    return matrix
+
+
+class _CircuitKey:
+    """Hashable wrapper around a stim circuit, for use as a cache key. Hashing uses the
+    circuit text, while equality compares the circuits exactly (the text rounds gate
+    arguments)."""
+
+    __slots__ = ("circuit", "_hash")
+
+    def __init__(self, circuit: stim.Circuit) -> None:
+        self.circuit = circuit.copy()
+        self._hash = hash(str(circuit))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _CircuitKey) and self.circuit == other.circuit
+
+
+@lru_cache(maxsize=32)
+def _cached_circuit_understander(
+    key: _CircuitKey, decompose_errors: bool
+) -> CircuitUnderstander:
+    return CircuitUnderstander(circuit=key.circuit, decompose_errors=decompose_errors)
+
+
+def cached_circuit_understander(
+    circuit: stim.Circuit, decompose_errors: bool = False
+) -> CircuitUnderstander:
+    """Return a CircuitUnderstander for the given circuit, reusing a previous result if
+    an identical circuit has been understood recently. The returned object is shared,
+    so treat its attributes as read only.
+
+    Parameters
+    ----------
+    circuit : stim.Circuit
+        stim circuit describing our experiment.
+    decompose_errors : bool, optional
+        Whether or not to decompose the errors into graphlike errors, by default False.
+
+    Returns
+    -------
+    CircuitUnderstander
+    """
+    return _cached_circuit_understander(_CircuitKey(circuit), decompose_errors)
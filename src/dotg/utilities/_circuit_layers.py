@@ -21,18 +21,11 @@ def get_circuit_layers(circuit: stim.Circuit) -> List[stim.Circuit]:
     List[stim.Circuit]
         List of stim circuits, where each element represents one timestep of the circuit.
     """
-    layers = [
-        idx + 1 for idx, instr in enumerate(circuit) if instr.name == StimDecorators.TICK
-    ]
-    circuit_by_layers = [
-        (list(circuit) + [""])[slice(ix, iy)]
-        for ix, iy in zip([0] + layers, layers + [-1])
-    ]
-    sub_circuits = []
-    for layer in circuit_by_layers:
-        new_circ = stim.Circuit()
-        for instr in layer:
-            new_circ.append(name=instr)
-        sub_circuits.append(new_circ)
-
-    return sub_circuits
+    layers, layer_start = [], 0
+    for idx, instr in enumerate(circuit):
+        if instr.name == StimDecorators.TICK:
+            layers.append(circuit[layer_start : idx + 1])
+            layer_start = idx + 1
+    layers.append(circuit[layer_start:])
+
+    return layers
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any, List, Tuple
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 import numpy as np
 import stim
@@ -16,6 +19,25 @@ from dotg.utilities.stim_assets import (
 
 # pylint: disable=no-member
 
+_NOISE_CHANNELS = frozenset(
+    OneQubitNoiseChannels.members() + TwoQubitNoiseChannels.members()
+)
+_MEASUREMENT_GATES = frozenset(MeasurementGates.members())
+
+# When excluding empty syndromes, batches after the first are oversized by this factor
+# relative to the expected number of shots needed, and the observed fraction of
+# non-empty syndromes is taken to be at least _MIN_ACCEPTANCE_RATE.
+_RESAMPLE_MARGIN = 1.5
+_MIN_ACCEPTANCE_RATE = 1e-3
+# Later batches draw at most this many shots (or the number requested, if larger), so
+# that a low acceptance rate cannot ask for more shots than fit in memory.
+_MAX_RESAMPLE_BATCH = 1 << 16
+
+# Requests for at least this many shots are split across threads, each drawing from its
+# own compiled sampler. This only helps if stim releases the GIL while sampling.
+_PARALLEL_SHOT_THRESHOLD = 50_000
+_MAX_SAMPLING_THREADS = 8
+
 
 class NoNoiseInCircuitError(ValueError):
     """Error to highlight when circuits contain no error messages."""
@@ -38,15 +60,13 @@ def check_if_noisy_circuit(circuit: stim.Circuit) -> bool:
     bool
         Whether the circuit has noise entries.
     """
-    if any(
-        instr.name in OneQubitNoiseChannels.members() + TwoQubitNoiseChannels.members()
-        for instr in circuit
-    ) or any(
-        any(x > 0 for x in instr.gate_args_copy())
-        for instr in circuit
-        if instr.name in MeasurementGates.members()
-    ):
-        return True
+    for instr in circuit:
+        if instr.name in _NOISE_CHANNELS:
+            return True
+        if instr.name in _MEASUREMENT_GATES and any(
+            x > 0 for x in instr.gate_args_copy()
+        ):
+            return True
 
     return False
 
@@ -56,10 +76,28 @@ class Sampler:
 
     def __init__(self, circuit: stim.Circuit) -> None:
         self.circuit = circuit
+        self._is_noisy = check_if_noisy_circuit(circuit=circuit)
+        # Compiled on first use by _compiled_sampler, and reused after that.
+        self._detector_sampler: Optional[stim.CompiledDetectorSampler] = None
+        # Further samplers for the threads of large requests; a compiled sampler holds
+        # its own simulator state, so it must not be shared between threads. The
+        # threads and their samplers are started on the first large request, and kept.
+        self._thread_samplers: List[stim.CompiledDetectorSampler] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def _compiled_sampler(self) -> stim.CompiledDetectorSampler:
+        """The detector sampler for the circuit, compiled on first use."""
+        if self._detector_sampler is None:
+            self._detector_sampler = self.circuit.compile_detector_sampler()
+        return self._detector_sampler
 
     def __call__(
-        self, num_shots: int | float = 1000, exclude_empty: bool = False
-    ) -> Tuple[NDArray[Any], List[bool]]:
+        self,
+        num_shots: int | float = 1000,
+        exclude_empty: bool = False,
+        bit_packed: bool = False,
+    ) -> Tuple[NDArray[np.uint8], NDArray]:
         """Given a stim circuit, sample from the detectors and generate some syndromes.
 
         TODO modify this from a __call__ functionality, as I've really gone off it.
@@ -73,47 +111,106 @@ class Sampler:
         exclude_empty : bool, optional
             Whether to ignore zero-weight syndromes, by default False. If True,
             syndromes will be generated repeatedly until enough have been collected.
+        bit_packed : bool, optional
+            Whether to return syndromes and logicals bit packed, by default False. If
+            True, each row is packed little endian into ceil(num_detectors / 8)
+            (respectively ceil(num_observables / 8)) uint8 values, as returned by
+            stim. Unpack with `np.unpackbits(..., axis=1, bitorder="little")`.
 
         Returns
         -------
-        Tuple[NDArray[Any], List[np.bool_]]
-            A tuple of iterables:
-                - The first element is an array of syndromes, of dimension
-                (num_shots * num_detectors). In each row, 1 (0) indicates detector did
-                (not) trigger.
-                - The second element is an list of booleans, of dimension
-                (num_shots * 1). These indicate whether the syndrome in the row triggered
-                the logical observable.
+        Tuple[NDArray[np.uint8], NDArray]
+            A tuple of arrays:
+                - The first element is a contiguous uint8 array of syndromes, of
+                dimension (num_shots * num_detectors). In each row, 1 (0) indicates
+                detector did (not) trigger.
+                - The second element is an array of booleans, of dimension
+                (num_shots * num_observables). These indicate whether the syndrome in
+                the row triggered each logical observable.
+            Both are bit packed if `bit_packed` is True.
 
         Raises
         ------
         NoNoiseInCircuitError
             If there are no noisy entries in the stim circuit.
         """
-        if not check_if_noisy_circuit(circuit=self.circuit):
+        if not self._is_noisy:
             raise NoNoiseInCircuitError()
 
-        detector_sampler = self.circuit.compile_detector_sampler()
-
         if exclude_empty:
-            syndrome_batch: List[List[int]] = []
-            observable_batch: List[bool] = []
-            while len(syndrome_batch) < num_shots:
-                _syndrome_batch, _observable_batch = detector_sampler.sample(
-                    shots=int(num_shots), separate_observables=True
-                )
-                for _syn, _ob in zip(_syndrome_batch, _observable_batch):
-                    if any(_syn):
-                        syndrome_batch.append(_syn)
-                        observable_batch.append(_ob)
+            syndrome_batch, observable_batch = self._sample_non_empty(
+                int(num_shots), bit_packed=bit_packed
+            )
         else:
-            syndrome_batch, observable_batch = detector_sampler.sample(
-                shots=int(num_shots), separate_observables=True
+            syndrome_batch, observable_batch = self._sample(
+                int(num_shots), bit_packed=bit_packed
             )
 
+        # stim returns bool (or, bit packed, uint8) arrays, so reinterpreting the rows
+        # as uint8 needs no copy.
         return (
-            np.asarray([[int(bit) for bit in syndrome] for syndrome in syndrome_batch])[
-                0 : int(num_shots)
-            ],
+            np.ascontiguousarray(syndrome_batch[0 : int(num_shots)]).view(np.uint8),
             observable_batch[0 : int(num_shots)],
         )
+
+    def _sample_non_empty(
+        self, num_shots: int, bit_packed: bool
+    ) -> Tuple[NDArray, NDArray]:
+        """Draw batches of syndromes and observables until at least `num_shots`
+        non-empty syndromes have been collected, and return only those."""
+        if num_shots == 0:
+            # Nothing to collect, but the (empty) arrays still have the usual widths.
+            return self._sample(0, bit_packed=bit_packed)
+        syndrome_shards: List[NDArray] = []
+        observable_shards: List[NDArray] = []
+        num_collected, num_drawn, batch_size = 0, 0, num_shots
+        while num_collected < num_shots:
+            syndrome_batch, observable_batch = self._sample(
+                batch_size, bit_packed=bit_packed
+            )
+            non_empty = syndrome_batch.any(axis=1)
+            syndrome_shards.append(syndrome_batch[non_empty])
+            observable_shards.append(observable_batch[non_empty])
+            num_collected += syndrome_shards[-1].shape[0]
+            num_drawn += batch_size
+            # Size the next batch from the fraction of non-empty syndromes seen so
+            # far, so that it is likely to collect all of the remaining shots.
+            acceptance_rate = max(num_collected / num_drawn, _MIN_ACCEPTANCE_RATE)
+            batch_size = min(
+                math.ceil(
+                    _RESAMPLE_MARGIN * (num_shots - num_collected) / acceptance_rate
+                ),
+                max(num_shots, _MAX_RESAMPLE_BATCH),
+            )
+        return np.concatenate(syndrome_shards), np.concatenate(observable_shards)
+
+    def _sample(self, num_shots: int, bit_packed: bool) -> Tuple[NDArray, NDArray]:
+        """Draw syndromes and observables from the compiled samplers, splitting large
+        requests evenly across threads."""
+        detector_sampler = self._compiled_sampler
+        num_threads = min(os.cpu_count() or 1, _MAX_SAMPLING_THREADS)
+        if num_shots < _PARALLEL_SHOT_THRESHOLD or num_threads == 1:
+            return detector_sampler.sample(
+                shots=num_shots, separate_observables=True, bit_packed=bit_packed
+            )
+
+        if self._executor is None:
+            self._thread_samplers = [
+                self.circuit.compile_detector_sampler() for _ in range(num_threads - 1)
+            ]
+            self._executor = ThreadPoolExecutor(max_workers=num_threads)
+        samplers = [detector_sampler, *self._thread_samplers]
+        bounds = np.linspace(0, num_shots, len(samplers) + 1, dtype=int)
+        batches = list(
+            self._executor.map(
+                lambda sampler, shots: sampler.sample(
+                    shots=shots, separate_observables=True, bit_packed=bit_packed
+                ),
+                samplers,
+                np.diff(bounds).tolist(),
+            )
+        )
+        return (
+            np.concatenate([syndromes for syndromes, _ in batches]),
+            np.concatenate([observables for _, observables in batches]),
+        )
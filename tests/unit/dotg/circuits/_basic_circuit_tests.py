@@ -37,3 +37,13 @@ class BasicCircuitTests:
         code_5rounds = self.CODE(distance=3, rounds=5)
         code_3rounds = self.CODE(distance=3, rounds=3)
         assert len(code_5rounds.memory) > len(code_3rounds.memory)
+
+    def test_memory_returns_equal_but_independent_circuits(self):
+        code = self.CODE(distance=3)
+        first, second = code.memory, code.memory
+        assert first == second
+        first.append("TICK")
+        assert first != code.memory
+
+    def test_instances_do_not_carry_a_dict(self):
+        assert not hasattr(self.CODE(distance=3), "__dict__")
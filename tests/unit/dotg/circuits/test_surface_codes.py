@@ -1,6 +1,7 @@
 from typing import Type
 
 import pytest
+import stim
 
 from dotg.circuits import SurfaceCode
 from dotg.circuits._surface_codes import SurfaceCodeSubClass
@@ -17,6 +18,21 @@ class BasicSurfaceSubCodeTests(BasicCircuitTests):
         with pytest.raises(ValueError, match="Memory basis must be one of `X` or `Z`."):
             self.CODE(distance=3, memory_basis="t")
 
+    @pytest.mark.parametrize(
+        "memory_basis, expected", [("x", "x"), ("X", "x"), ("z", "z"), ("Z", "z")]
+    )
+    def test_memory_basis_is_normalised(self, memory_basis, expected):
+        assert self.CODE(distance=3, memory_basis=memory_basis).memory_basis == expected
+
+    @pytest.mark.parametrize("memory_basis", ["x", "z"])
+    def test_memory_uses_variant_code_task(self, memory_basis):
+        expected = stim.Circuit.generated(
+            f"surface_code:{self.CODE._variant}_memory_{memory_basis}",
+            distance=3,
+            rounds=3,
+        ).flattened()
+        assert self.CODE(distance=3, memory_basis=memory_basis).memory == expected
+
 
 class TestSurfaceCode(BasicCodeFamilyTests):
     CODE_FAMILY = SurfaceCode
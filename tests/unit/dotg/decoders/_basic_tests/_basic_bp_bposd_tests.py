@@ -1,6 +1,9 @@
+from dataclasses import replace
 from typing import Type
 
+import numpy as np
 import pytest
+from scipy.special import expit  # pylint: disable=no-name-in-module
 
 from dotg.decoders._belief_propagation_base_class import (
     LDPCBeliefPropagationDecoder,
@@ -102,3 +105,167 @@ class BasicBeliefPropagationDecoderTests:
                 / len(decoder.parity_check[0])
                 >= 0.9
             )
+
+    def test_is_logical_failure_compares_logical_flips(self, decoder_graph):
+        no_errors = np.zeros(decoder_graph.parity_check.shape[1], dtype=np.uint8)
+        assert not decoder_graph.is_logical_failure(no_errors, np.asarray([False]))
+        assert decoder_graph.is_logical_failure(no_errors, np.asarray([True]))
+
+    @pytest.mark.parametrize("single_logical_shortcut", [True, False])
+    @pytest.mark.parametrize(
+        "logical, expected", [(False, False), ([0], False), (True, True), ([1], True)]
+    )
+    def test_is_logical_failure_accepts_bools_and_lists(
+        self, decoder_graph, monkeypatch, single_logical_shortcut, logical, expected
+    ):
+        if not single_logical_shortcut:
+            monkeypatch.setattr(decoder_graph._checks, "logical_support", None)
+        no_errors = [0] * decoder_graph.parity_check.shape[1]
+        assert decoder_graph.is_logical_failure(no_errors, logical) == expected
+
+    def test_decode_batch_return_shapes(self, decoder_hypergraph):
+        syndromes, _ = Sampler(BasicMemoryCircuits.HypergraphLike.NOISY_CIRCUIT)(20)
+        converged, error_patterns = decoder_hypergraph.decode_batch(syndromes)
+        assert converged.shape == (20,)
+        assert converged.dtype == np.bool_
+        assert error_patterns.shape == (20, decoder_hypergraph.parity_check.shape[1])
+
+    def test_decode_batch_matches_decoder_on_empty_syndromes(self, decoder_hypergraph):
+        syndromes = np.zeros(
+            (3, decoder_hypergraph.parity_check.shape[0]), dtype=np.uint8
+        )
+        syndromes[1, :2] = 1
+        converged, error_patterns = decoder_hypergraph.decode_batch(syndromes)
+        for syndrome, converged_, error_pattern in zip(
+            syndromes, converged, error_patterns
+        ):
+            assert (decoder_hypergraph.decoder.decode(syndrome) == error_pattern).all()
+            assert decoder_hypergraph.decoder.converge == converged_
+
+    @pytest.mark.parametrize("bit_packed", [True, False])
+    def test_decode_batch_with_workers_matches_serial_decoding(
+        self, decoder_hypergraph, bit_packed
+    ):
+        syndromes, _ = decoder_hypergraph.sampler(20, bit_packed=bit_packed)
+        serial = decoder_hypergraph.decode_batch(syndromes, bit_packed=bit_packed)
+        parallel = decoder_hypergraph.decode_batch(
+            syndromes, bit_packed=bit_packed, num_workers=2
+        )
+        assert (serial[0] == parallel[0]).all()
+        assert (serial[1] == parallel[1]).all()
+
+    def test_decode_batch_reuses_worker_processes(self, decoder_hypergraph):
+        syndromes, _ = decoder_hypergraph.sampler(20)
+        decoder_hypergraph.decode_batch(syndromes, num_workers=2)
+        worker_pool = decoder_hypergraph._state.worker_pool
+        decoder_hypergraph.decode_batch(syndromes, num_workers=2)
+        assert decoder_hypergraph._state.worker_pool is worker_pool
+        decoder_hypergraph.close()
+        assert decoder_hypergraph._state.worker_pool is None
+
+    def test_worker_processes_are_closed_by_the_context_manager(
+        self, decoder_hypergraph
+    ):
+        with self.DECODER_CLASS(
+            circuit=BasicMemoryCircuits.HypergraphLike.NOISY_CIRCUIT,
+            decoder_options=decoder_hypergraph.decoder_options,
+        ) as decoder:
+            syndromes, _ = decoder.sampler(20)
+            decoder.decode_batch(syndromes, num_workers=2)
+            assert decoder._state.worker_pool is not None
+        assert decoder._state.worker_pool is None
+
+    def test_logical_failures_agrees_with_is_logical_failure(self, decoder_hypergraph):
+        syndromes, logicals = Sampler(BasicMemoryCircuits.HypergraphLike.NOISY_CIRCUIT)(
+            20
+        )
+        _, error_patterns = decoder_hypergraph.decode_batch(syndromes)
+        expected = [
+            decoder_hypergraph.is_logical_failure(error_pattern, logical)
+            for error_pattern, logical in zip(error_patterns, logicals)
+        ]
+        assert list(decoder_hypergraph.logical_failures(error_patterns, logicals)) == (
+            expected
+        )
+
+    def test_logical_failures_accepts_bit_packed_logicals(self, decoder_hypergraph):
+        syndromes, logicals = decoder_hypergraph.sampler(50, bit_packed=True)
+        _, error_patterns = decoder_hypergraph.decode_batch(syndromes, bit_packed=True)
+        unpacked_logicals = np.unpackbits(
+            logicals,
+            axis=1,
+            count=decoder_hypergraph.logical_check.shape[0],
+            bitorder="little",
+        )
+        assert (
+            decoder_hypergraph.logical_failures(
+                error_patterns, logicals, bit_packed=True
+            )
+            == decoder_hypergraph.logical_failures(error_patterns, unpacked_logicals)
+        ).all()
+
+    def test_sampler_is_built_once(self, decoder_graph):
+        assert isinstance(decoder_graph.sampler, Sampler)
+        assert decoder_graph.sampler is decoder_graph.sampler
+
+    def test_setting_equal_options_keeps_decoder_object(self, decoder_graph):
+        decoder = decoder_graph.decoder
+        decoder_graph.decoder = replace(decoder_graph.decoder_options)
+        assert decoder_graph.decoder is decoder
+
+    def test_setting_new_options_rebuilds_decoder_object(self, decoder_graph):
+        new_decoder = self.DECODER_CLASS(
+            circuit=decoder_graph.circuit, decoder_options=decoder_graph.decoder_options
+        )
+        decoder = new_decoder.decoder
+        new_decoder.decoder = replace(
+            new_decoder.decoder_options,
+            max_iterations=new_decoder.decoder_options.max_iterations + 1,
+        )
+        assert new_decoder.decoder is not decoder
+        assert new_decoder.decoder.max_iter == decoder.max_iter + 1
+
+    def test_posterior_probabilities_agree_with_posterior_odds(
+        self, decoder_hypergraph, hypergraph_syndrome
+    ):
+        decoder_hypergraph.decode_syndrome(hypergraph_syndrome)
+        odds = decoder_hypergraph.posterior_probability_odds
+        assert np.allclose(decoder_hypergraph.posterior_probabilities, odds / (1 + odds))
+
+    @pytest.mark.parametrize("single_logical_shortcut", [True, False])
+    def test_is_logical_failure_matches_dense_logical_check(
+        self, decoder_hypergraph, monkeypatch, single_logical_shortcut
+    ):
+        if not single_logical_shortcut:
+            monkeypatch.setattr(decoder_hypergraph._checks, "logical_support", None)
+        rng = np.random.default_rng(0)
+        logical_check = decoder_hypergraph.logical_check
+        for _ in range(20):
+            error_pattern = rng.integers(0, 2, logical_check.shape[1], dtype=np.uint8)
+            logical = rng.integers(0, 2, logical_check.shape[0], dtype=np.uint8)
+            expected = bool(
+                np.any((logical_check.astype(int) @ error_pattern) % 2 != logical)
+            )
+            assert (
+                decoder_hypergraph.is_logical_failure(error_pattern, logical) == expected
+            )
+
+    def test_posteriors_are_reused_until_the_next_decode(
+        self, decoder_graph, decoder_hypergraph, graph_syndrome, hypergraph_syndrome
+    ):
+        for decoder, syndrome in zip(
+            [decoder_graph, decoder_hypergraph], [graph_syndrome, hypergraph_syndrome]
+        ):
+            decoder.decode_syndrome(syndrome)
+            probabilities = decoder.posterior_probabilities
+            posteriors = decoder._state.posteriors
+            probabilities[:] = 0
+            assert decoder.posterior_probabilities.all()
+            assert decoder._state.posteriors is posteriors
+
+            decoder.decode_syndrome(np.zeros_like(syndrome))
+            assert decoder._state.posteriors is None
+            assert np.array_equal(
+                decoder.posterior_probabilities,
+                expit(-np.asarray(decoder.posterior_log_probability_odds)),
+            )
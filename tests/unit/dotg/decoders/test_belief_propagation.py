@@ -1,8 +1,10 @@
+import warnings
 from typing import Type
 
 import ldpc.bp_decoder as ldpc_bp
 import numpy as np
 import pytest
+from ldpc import bposd_decoder
 
 from dotg.decoders import BeliefPropagation
 from dotg.decoders._belief_propagation_base_class import (
@@ -94,6 +96,7 @@ class TestBeliefPropagation(BasicBeliefPropagationDecoderTests, BasicDecoderTest
         assert (
             bp_decoder.decoder_options.osd_order is None
         ), "OSD order parameter of decoder_options was not properly erased."
+        assert not isinstance(bp_decoder.decoder, bposd_decoder)
 
     def test_return_types_from_decode_syndrome(self, decoder_graph):
         syndrome = [0, 1]
@@ -128,6 +131,14 @@ class TestBeliefPropagation(BasicBeliefPropagationDecoderTests, BasicDecoderTest
         assert converged
         assert not all(remaining)
 
+    def test_skipping_remaining_syndrome_returns_input_syndrome(self, decoder_graph):
+        syndrome = [1, 1]
+        converged, _, remaining = decoder_graph.decode_syndrome(
+            syndrome, compute_remaining=False
+        )
+        assert converged
+        assert (remaining == syndrome).all()
+
     def test_convergence_property(self, decoder_graph):
         syndrome = [1, 1]
         decoder_graph.decode_syndrome(syndrome)
@@ -135,16 +146,17 @@ class TestBeliefPropagation(BasicBeliefPropagationDecoderTests, BasicDecoderTest
 
     @pytest.mark.parametrize(
         "syndrome, error_pattern, expected",
-        [([0, 0], [1, 1], [0, 1]), ([0, 1], [0, 0], [0, 1]), ([1, 1], [0, 0], [1, 1])],
+        [
+            ([0, 0], [1, 1, 0, 0, 0], [0, 1]),
+            ([0, 1], [0, 0, 0, 0, 0], [0, 1]),
+            ([1, 1], [0, 0, 0, 0, 0], [1, 1]),
+        ],
     )
     def test_update_syndrome_from_error_pattern(
         self, decoder_graph, syndrome, error_pattern, expected
     ):
         """If this test fails, double check the `expected` entry by calling
-        [
-          (sum(x * y) for x, y in zip(pcm, error_pattern) + syndyome[idx]) % 2
-              for idx, pcm in enumerate(parity_check_matrix)
-        ]
+        (parity_check_matrix @ error_pattern + syndrome) % 2
         where parity_check_matrix = dotg.utilites.CircuitUnderstander(decoder_graph.circuit).parity_check
         """
         assert (
@@ -152,6 +164,20 @@ class TestBeliefPropagation(BasicBeliefPropagationDecoderTests, BasicDecoderTest
             == expected
         ).all()
 
+    def test_update_syndromes_from_error_patterns(self, decoder_hypergraph):
+        syndromes, _ = decoder_hypergraph.sampler(20)
+        _, error_patterns = decoder_hypergraph.decode_batch(syndromes)
+        expected = [
+            decoder_hypergraph.update_syndrome_from_error_pattern(*row)
+            for row in zip(syndromes, error_patterns)
+        ]
+        assert (
+            decoder_hypergraph.update_syndromes_from_error_patterns(
+                syndromes, error_patterns
+            )
+            == expected
+        ).all()
+
     def test_logical_error_raises_warning(self, decoder_graph, decoder_hypergraph):
         match = """As Belief Propagation is not guaranteed to converge on quantum codes, it 
             does not yet permit logical error functionality. This function will only 
@@ -160,3 +186,14 @@ class TestBeliefPropagation(BasicBeliefPropagationDecoderTests, BasicDecoderTest
             decoder_graph.logical_error(10)
         with pytest.warns(match=match):
             decoder_hypergraph.logical_error(10)
+
+    def test_logical_error_only_warns_once_per_decoder(self):
+        decoder = self.DECODER_CLASS(
+            circuit=BasicMemoryCircuits.GraphLike.NOISY_CIRCUIT,
+            decoder_options=LDPCDecoderOptions(max_iterations=1),
+        )
+        with pytest.warns(UserWarning):
+            decoder.logical_error(10)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            decoder.logical_error(10)
@@ -71,3 +71,8 @@ class TestLDPC_DecoderOptions:
             max_iterations=1, osd_method=OSDMethods.EXHAUSTIVE, osd_order=osd_order
         )
         assert ldpc_do.osd_order == osd_order
+
+    @pytest.mark.parametrize("msg_updates", [None, 0, 1])
+    def test_message_updates_are_cast_to_enum(self, msg_updates):
+        options = LDPCDecoderOptions(max_iterations=1, message_updates=msg_updates)
+        assert isinstance(options.message_updates, MessageUpdates)
@@ -31,3 +31,39 @@ class TestMinimumWeightPerfectMatching(BasicDecoderTests):
 
     def test_logical_error_returns_float(self, mwpm):
         assert isinstance(mwpm.logical_error(num_shots=1000), float)
+
+    def test_count_logical_errors_matches_decoding_every_shot(self, mwpm):
+        syndromes, observables = mwpm.sampler.sample(
+            shots=500, separate_observables=True
+        )
+        predicted_observables = mwpm.matching.decode_batch(syndromes)
+        assert mwpm._count_logical_errors(
+            syndromes, observables
+        ) == np.count_nonzero(np.any(predicted_observables != observables, axis=1))
+
+    def test_matching_is_shared_between_identical_circuits(self, mwpm):
+        other = MinimumWeightPerfectMatching(
+            BasicMemoryCircuits.GraphLike.NOISY_CIRCUIT.copy()
+        )
+        assert other.matching is mwpm.matching
+
+    def test_logical_error_reuses_sample_buffers(self):
+        mwpm = MinimumWeightPerfectMatching(BasicMemoryCircuits.GraphLike.NOISY_CIRCUIT)
+        mwpm.logical_error(num_shots=200)
+        syndrome_buffer = mwpm._syndrome_buffer
+        mwpm.logical_error(num_shots=100)
+        assert mwpm._syndrome_buffer is syndrome_buffer
+        mwpm.logical_error(num_shots=300)
+        assert mwpm._syndrome_buffer.shape[0] == 300
+
+    def test_logical_error_samples_in_bounded_batches(self, monkeypatch):
+        monkeypatch.setattr(
+            "dotg.decoders._pymatching._SHOTS_PER_BATCH", 64, raising=True
+        )
+        mwpm = MinimumWeightPerfectMatching(BasicMemoryCircuits.GraphLike.NOISY_CIRCUIT)
+        logical_error = mwpm.logical_error(num_shots=1000)
+        assert 0 <= logical_error <= 1
+        assert mwpm._syndrome_buffer.shape[0] == 64
+
+    def test_logical_error_with_no_shots_is_zero(self, mwpm):
+        assert mwpm.logical_error(num_shots=0) == 0.0
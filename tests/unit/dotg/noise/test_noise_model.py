@@ -1,7 +1,7 @@
 import pytest
 import stim
 
-from dotg.noise import NoiseModel
+from dotg.noise import DepolarizingNoise, NoiseModel
 from dotg.utilities.stim_assets import OneQubitNoiseChannels, TwoQubitNoiseChannels
 
 
@@ -358,9 +358,7 @@ class TestNoiseModel:
                 stim.Circuit(
                     """R 0 1 2 3 4
                 H 0 1 2
-                M(0.00001) 0 1 2 3 4
-                TICK
-                R 0 1 2 3 4
+                MR(0.00001) 0 1 2 3 4
                 """
                 ),
             ),
@@ -403,6 +401,17 @@ class TestNoiseModel:
             circuit, instruction
         )
 
+    def test_permute_circuit_splits_measure_and_reset_instructions(self):
+        noise_model = NoiseModel(measurement_noise=1e-5)
+        assert noise_model.permute_circuit(
+            stim.Circuit("H 0 1\nMR 0 1")
+        ) == stim.Circuit(
+            """H 0 1
+            M(0.00001) 0 1
+            TICK
+            R 0 1"""
+        )
+
     @pytest.mark.parametrize(
         "noise_model, circuit, instruction, final_circuit",
         [
@@ -571,3 +580,225 @@ class TestNoiseModel:
             "in the experiment. Add QUBIT_COORDS commands to the beginning of the circuit.",
         ):
             noise_model.permute_circuit(circuit)
+
+    def test_permute_circuit_keeps_arguments_and_targets_exact(self):
+        noise_model = NoiseModel(
+            one_qubit_gate_noise=(OneQubitNoiseChannels.DEPOLARIZE1, 1 / 300),
+            measurement_noise=1 / 700,
+        )
+        circuit = stim.Circuit(
+            """H 0
+            M !0 1
+            DETECTOR(0.123456789) rec[-1]
+            REPEAT 2 {
+                H 0
+            }
+            MPP X0*Z1"""
+        )
+        expected_output = stim.Circuit()
+        expected_output.append("H", [0])
+        expected_output.append("DEPOLARIZE1", [0], 1 / 300)
+        expected_output.append("M", [stim.target_inv(0), 1], 1 / 700)
+        expected_output.append("DETECTOR", [stim.target_rec(-1)], 0.123456789)
+        expected_output.append(stim.CircuitRepeatBlock(2, stim.Circuit("H 0")))
+        expected_output.append(
+            "MPP", [stim.target_x(0), stim.target_combiner(), stim.target_z(1)]
+        )
+        assert expected_output == noise_model.permute_circuit(circuit)
+
+    def test_tagged_instructions_are_permuted(self):
+        noise_model = NoiseModel(
+            one_qubit_gate_noise=(OneQubitNoiseChannels.X_ERROR, 0.01),
+            measurement_noise=0.02,
+        )
+        assert noise_model.permute_circuit(
+            stim.Circuit("H[mytag] 0\nZ[other] 1\nM[t](0.01) 0 1")
+        ) == stim.Circuit(
+            """H[mytag] 0
+            X_ERROR(0.01) 0
+            Z[other] 1
+            X_ERROR(0.01) 1
+            M(0.02) 0 1"""
+        )
+
+    def test_tags_and_targets_are_copied_exactly(self):
+        circuit = stim.Circuit()
+        circuit.append(stim.CircuitInstruction("H", [0], tag="a]b\\c\nd"))
+        circuit.append(
+            "MPP",
+            [
+                stim.target_x(0, invert=True),
+                stim.target_combiner(),
+                stim.target_z(1),
+                stim.target_y(2),
+            ],
+        )
+        circuit.append("CX", [stim.target_sweep_bit(0), 1, stim.target_rec(-1), 2])
+        assert NoiseModel().permute_circuit(circuit) == circuit
+
+    def test_handlers_are_given_stim_instructions(self):
+        instructions = []
+
+        class RecordingNoiseModel(NoiseModel):
+            def _measurement_instruction(self, circuit, instruction):
+                instructions.append(instruction)
+                return super()._measurement_instruction(circuit, instruction)
+
+        RecordingNoiseModel(measurement_noise=0.01).permute_circuit(
+            stim.Circuit("M !0 1")
+        )
+        assert instructions == [
+            stim.CircuitInstruction("M", [stim.target_inv(0), 1])
+        ]
+
+    def test_gates_without_noise_are_copied_unchanged(self):
+        noise_model = NoiseModel(
+            two_qubit_gate_noise=(TwoQubitNoiseChannels.DEPOLARIZE2, 0.01)
+        )
+        assert "H" not in noise_model._instruction_handlers
+        assert noise_model.permute_circuit(
+            stim.Circuit("R 0 1\nH 0\nCX 0 1")
+        ) == stim.Circuit("R 0 1\nH 0\nCX 0 1\nDEPOLARIZE2(0.01) 0 1")
+
+    def test_noise_is_written_after_each_gate(self):
+        noise_model = NoiseModel(
+            one_qubit_gate_noise=(OneQubitNoiseChannels.X_ERROR, 0.01),
+            two_qubit_gate_noise=(TwoQubitNoiseChannels.DEPOLARIZE2, 0.01),
+        )
+        assert noise_model.permute_circuit(
+            stim.Circuit("H 0\nX 1\nCX 2 3\nH 0\nTICK\nH 1")
+        ) == stim.Circuit(
+            """H 0
+            X_ERROR(0.01) 0
+            X 1
+            X_ERROR(0.01) 1
+            CX 2 3
+            DEPOLARIZE2(0.01) 2 3
+            H 0
+            X_ERROR(0.01) 0
+            TICK
+            H 1
+            X_ERROR(0.01) 1"""
+        )
+
+    def test_adjacent_noise_with_the_same_arguments_is_merged(self):
+        noise_model = NoiseModel(
+            one_qubit_gate_noise=(OneQubitNoiseChannels.X_ERROR, 0.01),
+        )
+        noisy_circuit = noise_model.permute_circuit(
+            stim.Circuit("H 0\nX_ERROR(0.01) 1\nX_ERROR(0.02) 2")
+        )
+        assert noisy_circuit == stim.Circuit("H 0\nX_ERROR(0.01) 0 1\nX_ERROR(0.02) 2")
+        assert len(noisy_circuit) == 3
+
+    def test_permute_circuit_batch_matches_permute_circuit(self, noise_model):
+        circuit = stim.Circuit.generated(
+            "surface_code:rotated_memory_z", distance=3, rounds=2
+        )
+        noisy_circuits = noise_model.permute_circuit_batch(
+            circuit,
+            [
+                {},
+                {"measurement_noise": 0.02},
+                {"two_qubit_gate_noise": (TwoQubitNoiseChannels.DEPOLARIZE2, 0.03)},
+            ],
+        )
+        assert noisy_circuits == [
+            noise_model.permute_circuit(circuit),
+            NoiseModel(
+                two_qubit_gate_noise=(TwoQubitNoiseChannels.DEPOLARIZE2, 0.01),
+                one_qubit_gate_noise=(OneQubitNoiseChannels.DEPOLARIZE1, 0.01),
+                reset_noise=(OneQubitNoiseChannels.Y_ERROR, 0.001),
+                idle_noise=(OneQubitNoiseChannels.Z_ERROR, 0.0025),
+                measurement_noise=0.02,
+            ).permute_circuit(circuit),
+            NoiseModel(
+                two_qubit_gate_noise=(TwoQubitNoiseChannels.DEPOLARIZE2, 0.03),
+                one_qubit_gate_noise=(OneQubitNoiseChannels.DEPOLARIZE1, 0.01),
+                reset_noise=(OneQubitNoiseChannels.Y_ERROR, 0.001),
+                idle_noise=(OneQubitNoiseChannels.Z_ERROR, 0.0025),
+                measurement_noise=1e-2,
+            ).permute_circuit(circuit),
+        ]
+
+    def test_permute_circuit_returns_a_fresh_copy_of_a_cached_result(self, noise_model):
+        circuit = stim.Circuit.generated(
+            "surface_code:rotated_memory_z", distance=3, rounds=2
+        )
+        first = noise_model.permute_circuit(circuit)
+        first.append("TICK")
+        assert noise_model.permute_circuit(circuit) == first[:-1]
+
+    def test_permute_circuit_is_not_reused_after_the_input_changes(self):
+        noise_model = NoiseModel(measurement_noise=0.02)
+        circuit = stim.Circuit("M 0")
+        assert noise_model.permute_circuit(circuit) == stim.Circuit("M(0.02) 0")
+        circuit.append("M", [1])
+        assert noise_model.permute_circuit(circuit) == stim.Circuit("M(0.02) 0 1")
+
+    def test_permute_circuit_batch_uses_subclass_handlers(self):
+        class BasisChangeNoiseModel(NoiseModel):
+            def _measurement_instruction(self, circuit, instruction):
+                circuit.append(name="H", targets=instruction.targets_copy())
+                return super()._measurement_instruction(circuit, instruction)
+
+        noise_model = BasisChangeNoiseModel(measurement_noise=0.02)
+        noisy_circuits = noise_model.permute_circuit_batch(
+            stim.Circuit("M 0 1"), [{}, {"measurement_noise": 0.03}]
+        )
+        assert noisy_circuits == [
+            stim.Circuit("H 0 1\nM(0.02) 0 1"),
+            stim.Circuit("H 0 1\nM(0.03) 0 1"),
+        ]
+
+    def test_permute_circuit_batch_with_a_subclass_noise_model(self):
+        circuit = stim.Circuit.generated(
+            "surface_code:rotated_memory_z", distance=3, rounds=2
+        )
+        noise_model = DepolarizingNoise(physical_error=0.01)
+        noisy_circuits = noise_model.permute_circuit_batch(circuit, [{}])
+        assert noisy_circuits == [noise_model.permute_circuit(circuit)]
+        with pytest.raises(TypeError, match="DepolarizingNoise cannot be built"):
+            noise_model.permute_circuit_batch(circuit, [{"measurement_noise": 0.02}])
+        assert noise_model.physical_error == 0.01
+
+    def test_permute_circuit_is_cached_separately_for_subclasses(self):
+        class BasisChangeNoiseModel(NoiseModel):
+            def _measurement_instruction(self, circuit, instruction):
+                circuit.append(name="H", targets=instruction.targets_copy())
+                return super()._measurement_instruction(circuit, instruction)
+
+        circuit = stim.Circuit("M 0 1")
+        noisy_circuit = NoiseModel(measurement_noise=0.02).permute_circuit(circuit)
+        assert noisy_circuit == stim.Circuit("M(0.02) 0 1")
+        noisy_circuit = BasisChangeNoiseModel(measurement_noise=0.02).permute_circuit(
+            circuit
+        )
+        assert noisy_circuit == stim.Circuit("H 0 1\nM(0.02) 0 1")
+
+    def test_permute_circuit_is_cached_separately_for_each_noise_model(self):
+        class ExtraNoiseModel(NoiseModel):
+            def __init__(self, extra, **kwargs):
+                self.extra = extra
+                super().__init__(**kwargs)
+
+            def _noisy_gate_instruction(self, circuit, instruction):
+                circuit = super()._noisy_gate_instruction(circuit, instruction)
+                if self.extra:
+                    circuit.append(
+                        name="X_ERROR", targets=instruction.targets_copy(), arg=0.5
+                    )
+                return circuit
+
+        circuit = stim.Circuit("H 0 1")
+        one_qubit_gate_noise = (OneQubitNoiseChannels.DEPOLARIZE1, 0.01)
+        without_extra = ExtraNoiseModel(
+            False, one_qubit_gate_noise=one_qubit_gate_noise
+        ).permute_circuit(circuit)
+        with_extra = ExtraNoiseModel(
+            True, one_qubit_gate_noise=one_qubit_gate_noise
+        ).permute_circuit(circuit)
+        assert without_extra == stim.Circuit("H 0 1\nDEPOLARIZE1(0.01) 0 1")
+        assert with_extra == stim.Circuit(
+            "H 0 1\nDEPOLARIZE1(0.01) 0 1\nX_ERROR(0.5) 0 1"
+        )
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from dotg.utilities._bit_packing import pack_rows, packed_mod2_matmul, word_parity
+
+
+class TestBitPacking:
+    @pytest.mark.parametrize(
+        "num_columns, num_words", [(1, 1), (64, 1), (65, 2), (200, 4)]
+    )
+    def test_packed_shape(self, num_columns, num_words):
+        packed = pack_rows(np.ones((3, num_columns), dtype=np.uint8))
+        assert packed.shape == (3, num_words)
+        assert packed.dtype == np.uint64
+
+    def test_vector_is_packed_as_single_row(self):
+        assert pack_rows([1, 0, 1]).shape == (1, 1)
+
+    @pytest.mark.parametrize("value", [0, 1, 3, 7, 2**63, 2**64 - 1, 123456789])
+    def test_word_parity(self, value):
+        expected = bin(value).count("1") % 2
+        assert word_parity(np.asarray([value], dtype=np.uint64))[0] == expected
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_packed_matmul_matches_dense_matmul(self, seed):
+        rng = np.random.default_rng(seed)
+        matrix = rng.integers(0, 2, size=(3, 150), dtype=np.uint8)
+        vectors = rng.integers(0, 2, size=(40, 150), dtype=np.uint8)
+        assert (
+            packed_mod2_matmul(pack_rows(matrix), pack_rows(vectors))
+            == (vectors.astype(int) @ matrix.T) % 2
+        ).all()
@@ -1,9 +1,11 @@
 import numpy as np
 import pytest
+import stim
+from scipy.sparse import csr_matrix
 
 from dotg.circuits import SurfaceCode
 from dotg.noise import DepolarizingNoise
-from dotg.utilities import CircuitUnderstander
+from dotg.utilities import CircuitUnderstander, cached_circuit_understander
 
 toy_circuit = DepolarizingNoise(physical_error=1e-2).permute_circuit(
     SurfaceCode.Rotated(distance=2, rounds=1).memory
@@ -17,11 +19,11 @@ class TestCircuitUnderstander:
 
     @pytest.fixture(scope="class")
     def parity_check(self, circuit_understander):
-        return circuit_understander.parity_check
+        return circuit_understander.parity_check.toarray()
 
     @pytest.fixture(scope="class")
     def logical_check(self, circuit_understander):
-        return circuit_understander.logical_check
+        return circuit_understander.logical_check.toarray()
 
     @pytest.fixture(scope="class")
     def error_probabilities(self, circuit_understander):
@@ -35,6 +37,15 @@ class TestCircuitUnderstander:
         expected_logical_check = np.asarray([0, 0, 1, 0, 1])
         assert (logical_check == expected_logical_check).all()
 
+    def test_check_matrices_are_sparse_binary_matrices(self, circuit_understander):
+        for matrix in (
+            circuit_understander.parity_check,
+            circuit_understander.logical_check,
+        ):
+            assert isinstance(matrix, csr_matrix)
+            assert matrix.dtype == np.uint8
+            assert (matrix.data == 1).all()
+
     def test_error_probabilities_are_as_expected(self, error_probabilities):
         expected_error_probabilities = [
             0.00927749898298139,
@@ -47,3 +58,22 @@ class TestCircuitUnderstander:
             np.isclose(a, b)
             for a, b in zip(error_probabilities, expected_error_probabilities)
         )
+
+
+class TestCachedCircuitUnderstander:
+    def test_identical_circuits_share_a_result(self):
+        assert cached_circuit_understander(toy_circuit) is cached_circuit_understander(
+            toy_circuit.copy()
+        )
+
+    def test_circuits_differing_beyond_printed_precision_do_not_share_a_result(self):
+        circuit_1 = stim.Circuit()
+        circuit_1.append("X_ERROR", [0], 0.1 / 7)
+        circuit_1.append("M", [0])
+        circuit_1.append("DETECTOR", [stim.target_rec(-1)])
+        circuit_2 = stim.Circuit(str(circuit_1))
+        assert str(circuit_1) == str(circuit_2)
+        assert (
+            cached_circuit_understander(circuit_1).error_probabilities
+            != cached_circuit_understander(circuit_2).error_probabilities
+        )
@@ -26,3 +26,9 @@ class TestGetCircuitLayers:
         assert isinstance(
             subcircuits, list
         ), "Output from get_circuit_layers is expected to be a list."
+
+    def test_layers_end_at_each_tick_and_rebuild_the_circuit(self, simple_circuit):
+        subcircuits = get_circuit_layers(simple_circuit)
+        assert subcircuits[0] == stim.Circuit("R 0 1 2\nTICK")
+        assert subcircuits[1] == stim.Circuit("M 0 1 2")
+        assert sum(subcircuits, stim.Circuit()) == simple_circuit
@@ -1,4 +1,8 @@
+import math
+
+import numpy as np
 import pytest
+import stim
 
 from dotg.utilities import Sampler
 from dotg.utilities._syndrome_sampler import (
@@ -33,6 +37,12 @@ class TestSampler:
         with pytest.raises(NoNoiseInCircuitError, match=NoNoiseInCircuitError().args[0]):
             sampler(BasicMemoryCircuits.GraphLike.NOISELESS_CIRCUIT)
 
+    def test_detector_sampler_is_compiled_once(self, sampler):
+        sampler(10)
+        detector_sampler = sampler._detector_sampler
+        sampler(10)
+        assert sampler._detector_sampler is detector_sampler
+
     @pytest.mark.parametrize("exclude_empty", [True, False])
     @pytest.mark.parametrize("num_shots", [59, 723, 1467])
     def test_return_array_length_is_consistent_regardless_of_empty_exclusion(
@@ -56,3 +66,109 @@ class TestSampler:
         for _ in range(repeat):
             syndrome_batch, _ = sampler(100, False)
             assert any(not any(syn) for syn in syndrome_batch)
+
+    @pytest.mark.parametrize("exclude_empty", [True, False])
+    def test_syndromes_are_contiguous_uint8(self, sampler, exclude_empty):
+        syndrome_batch, _ = sampler(100, exclude_empty)
+        assert syndrome_batch.dtype == np.uint8
+        assert syndrome_batch.flags.c_contiguous
+        assert syndrome_batch.shape == (100, sampler.circuit.num_detectors)
+
+    @pytest.mark.parametrize("exclude_empty", [True, False])
+    def test_bit_packed_output_shape(self, sampler, exclude_empty):
+        num_detectors = sampler.circuit.num_detectors
+        syndrome_batch, logical_batch = sampler(100, exclude_empty, bit_packed=True)
+        assert syndrome_batch.shape == (100, -(-num_detectors // 8))
+        assert len(logical_batch) == 100
+        unpacked = np.unpackbits(
+            syndrome_batch, axis=1, count=num_detectors, bitorder="little"
+        )
+        assert unpacked.shape == (100, num_detectors)
+        if exclude_empty:
+            assert unpacked.any(axis=1).all()
+
+    def test_exclude_empty_sizes_later_batches_from_acceptance_rate(
+        self, sampler, monkeypatch
+    ):
+        batch_sizes = []
+
+        class SparseSampler:
+            def sample(self, shots, separate_observables, bit_packed):
+                batch_sizes.append(shots)
+                syndromes = np.zeros((shots, 4), dtype=bool)
+                syndromes[::20, 0] = True
+                return syndromes, np.zeros((shots, 1), dtype=bool)
+
+        monkeypatch.setattr(sampler, "_detector_sampler", SparseSampler())
+        syndrome_batch, _ = sampler(100, exclude_empty=True)
+        assert syndrome_batch.shape == (100, 4)
+        assert batch_sizes[0] == 100 and len(batch_sizes) == 2
+
+    @pytest.mark.parametrize("bit_packed", [True, False])
+    def test_exclude_empty_with_no_shots_gives_empty_arrays(self, sampler, bit_packed):
+        syndrome_batch, logical_batch = sampler(
+            0, exclude_empty=True, bit_packed=bit_packed
+        )
+        num_detectors = sampler.circuit.num_detectors
+        num_observables = sampler.circuit.num_observables
+        if bit_packed:
+            num_detectors = math.ceil(num_detectors / 8)
+            num_observables = math.ceil(num_observables / 8)
+        assert syndrome_batch.shape == (0, num_detectors)
+        assert logical_batch.shape == (0, num_observables)
+
+    def test_exclude_empty_batches_are_bounded(self, sampler, monkeypatch):
+        monkeypatch.setattr("dotg.utilities._syndrome_sampler._MAX_RESAMPLE_BATCH", 200)
+        batch_sizes = []
+
+        class VerySparseSampler:
+            def sample(self, shots, separate_observables, bit_packed):
+                batch_sizes.append(shots)
+                syndromes = np.zeros((shots, 4), dtype=bool)
+                syndromes[::50, 0] = True
+                return syndromes, np.zeros((shots, 1), dtype=bool)
+
+        monkeypatch.setattr(sampler, "_detector_sampler", VerySparseSampler())
+        syndrome_batch, _ = sampler(10, exclude_empty=True)
+        assert syndrome_batch.shape == (10, 4)
+        assert max(batch_sizes) == 200
+
+    @pytest.mark.parametrize("bit_packed", [True, False])
+    def test_large_requests_are_split_across_thread_samplers(
+        self, bit_packed, monkeypatch
+    ):
+        monkeypatch.setattr(
+            "dotg.utilities._syndrome_sampler._PARALLEL_SHOT_THRESHOLD", 100
+        )
+        monkeypatch.setattr("dotg.utilities._syndrome_sampler.os.cpu_count", lambda: 3)
+        sampler = Sampler(BasicMemoryCircuits.GraphLike.NOISY_CIRCUIT)
+        syndrome_batch, logical_batch = sampler(1001, bit_packed=bit_packed)
+        assert len(sampler._thread_samplers) == 2
+        assert len(syndrome_batch) == len(logical_batch) == 1001
+        assert syndrome_batch.dtype == np.uint8 and syndrome_batch.flags.c_contiguous
+        executor = sampler._executor
+        sampler(1001, bit_packed=bit_packed)
+        assert sampler._executor is executor
+
+    def test_threaded_samples_have_the_circuit_statistics(self, monkeypatch):
+        monkeypatch.setattr(
+            "dotg.utilities._syndrome_sampler._PARALLEL_SHOT_THRESHOLD", 100
+        )
+        monkeypatch.setattr("dotg.utilities._syndrome_sampler.os.cpu_count", lambda: 3)
+        sampler = Sampler(
+            stim.Circuit(
+                """X_ERROR(0.2) 0
+                M 0
+                DETECTOR rec[-1]
+                OBSERVABLE_INCLUDE(0) rec[-1]"""
+            )
+        )
+        syndrome_batch, logical_batch = sampler(30_000)
+        assert np.array_equal(syndrome_batch[:, 0], logical_batch[:, 0])
+        # Each thread's shard has the expected error rate, and the shards differ, so
+        # the thread samplers are not drawing the same shots.
+        shards = np.split(syndrome_batch[:, 0], 3)
+        for shard in shards:
+            assert abs(shard.mean() - 0.2) < 0.02
+        assert not np.array_equal(shards[0], shards[1])
+        assert not np.array_equal(shards[1], shards[2])